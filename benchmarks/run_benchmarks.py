@@ -0,0 +1,298 @@
+"""
+Offline benchmark suite.
+
+Runs the loaders, merger, cleaner, forecaster, result stores and the
+backfill / append jobs against synthetic data and the SQLite Supabase
+stand-in (utils.fake_supabase), at several data sizes.
+
+    python -m benchmarks.run_benchmarks                       # tiny, small, medium
+    python -m benchmarks.run_benchmarks --sizes large --latency 0.05
+    python -m benchmarks.run_benchmarks --baseline data/benchmark_results.json
+
+Everything runs in a scratch directory; no network access is needed.
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+from benchmarks.synthetic import asset_config, forecast_results, generate_prices
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# name -> (assets, total price rows)
+SIZES = {
+    "tiny": (4, 1_000),
+    "small": (20, 20_000),
+    "medium": (100, 200_000),
+    "large": (500, 1_000_000),
+}
+
+DEFAULT_SIZES = ["tiny", "small", "medium"]
+DEFAULT_OUTPUT = "data/benchmark_results.json"
+
+
+def _setup(workdir, latency):
+    """
+    Point every Supabase client at one fake database and make both
+    import styles (`config.…` from src/, `src.config.…` from scripts/)
+    resolvable. Must run before any project module is imported.
+    """
+    os.environ["SUPABASE_FAKE_DB"] = os.path.join(workdir, "supabase.db")
+    os.environ["SUPABASE_FAKE_LATENCY"] = str(latency)
+
+    for path in (ROOT, os.path.join(ROOT, "src")):
+        if path not in sys.path:
+            sys.path.insert(0, path)
+
+    os.chdir(workdir)
+    os.makedirs("data", exist_ok=True)
+
+
+class Bench:
+    def __init__(self, size, n_assets, n_rows, clients):
+        """
+        clients: every fake Supabase client in use (each module that
+        talks to Supabase creates its own); requests are summed over them
+        """
+        self.size = size
+        self.n_assets = n_assets
+        self.n_rows = n_rows
+        self.clients = clients
+        self.results = []
+
+    def _requests(self):
+        return sum(c.requests for c in self.clients)
+
+    def run(self, name, fn, rows=None):
+        """
+        Time fn() once; `rows` = rows processed (default: len of result)
+        """
+        requests_before = self._requests()
+        started = time.perf_counter()
+        result = fn()
+        seconds = time.perf_counter() - started
+
+        if rows is None:
+            try:
+                rows = len(result)
+            except TypeError:
+                rows = None
+
+        record = {
+            "size": self.size,
+            "assets": self.n_assets,
+            "rows": self.n_rows,
+            "benchmark": name,
+            "seconds": round(seconds, 4),
+            "items": rows,
+            "items_per_s": round(rows / seconds, 1) if rows and seconds else None,
+            "requests": self._requests() - requests_before,
+        }
+        self.results.append(record)
+        print(f"  {name:<32} {seconds:9.3f}s  items={rows}  requests={record['requests']}")
+
+        return result
+
+
+def run_size(size, n_assets, n_rows, prophet=True):
+    # Imported here: _setup() must have configured the environment first
+    import config.settings as settings
+    import src.config.settings as script_settings
+    from data import history_loader
+    from data.cloud_history_loader import load_cloud_histories, supabase
+    from data.merger import merge_historical_and_live
+    from processing.quality import clean_histories
+    from model.forecaster import forecast_batch_frames, train_and_forecast
+    from storage import cloud_store, local_store
+    from scripts import append_validated_history, backfill_history
+
+    print(f"\n=== {size}: {n_assets} assets, {n_rows:,} rows ===")
+
+    supabase.reset()
+    for path in ("data/results.db", backfill_history.CHECKPOINT_FILE):
+        if os.path.exists(path):
+            os.remove(path)
+
+    wide = generate_prices(n_assets, n_rows)
+    columns = list(wide.columns[1:])
+    configs = asset_config(columns)
+
+    # Both copies of settings (src/ and scripts/ import styles) see the
+    # synthetic assets
+    for module in (settings, script_settings):
+        module.ASSET_CONFIG.clear()
+        module.ASSET_CONFIG.update(configs)
+
+    csv_path = "data/commodity_futures.csv"
+    wide.to_csv(csv_path, index=False)
+    if os.path.exists(history_loader.columnar_path(csv_path)):
+        os.remove(history_loader.columnar_path(csv_path))
+
+    bench = Bench(size, n_assets, n_rows, [
+        supabase,
+        cloud_store.supabase,
+        backfill_history.supabase,
+        append_validated_history.supabase,
+    ])
+
+    # ---- Loaders ----
+    history_loader._column_cache.clear()
+    bench.run("history_loader.cold", lambda: history_loader.load_historical_assets(configs, csv_path))
+    history_loader._column_cache.clear()
+    histories = bench.run("history_loader.warm", lambda: history_loader.load_historical_assets(configs, csv_path))
+
+    # ---- Backfill (also seeds price_history) ----
+    backfill_history.HISTORICAL_FILE = csv_path
+    bench.run(
+        "backfill_history",
+        lambda: backfill_history.backfill_history(restart=True),
+        rows=int(wide[columns].notna().sum().sum())
+    )
+
+    bench.run("cloud_history.full", lambda: load_cloud_histories(columns, full_resync=True))
+    cloud = bench.run("cloud_history.incremental", lambda: load_cloud_histories(columns))
+
+    # ---- Merge & clean ----
+    live = {
+        asset: pd.DataFrame({
+            "date": [series.last_date + pd.Timedelta(days=1)],
+            "price": [float(series.dropna().last_price)],
+        })
+        for asset, series in cloud.items()
+    }
+
+    merged = bench.run(
+        "merger",
+        lambda: {a: merge_historical_and_live(s, live[a]) for a, s in cloud.items()}
+    )
+    frames, _ = bench.run(
+        "cleaner",
+        lambda: clean_histories(merged),
+        rows=n_assets
+    )
+
+    # ---- Forecasters ----
+    for engine in ("ewma", "holt_winters"):
+        forecasts = bench.run(f"forecast_batch.{engine}", lambda: forecast_batch_frames(frames, engine))
+
+    if prophet:
+        first = columns[0]
+        bench.run(
+            "prophet.one_asset",
+            lambda: train_and_forecast(frames[first], policy="compact"),
+            rows=len(frames[first])
+        )
+
+    # ---- Stores ----
+    def store(module):
+        for asset, forecast in forecasts.items():
+            prediction = float(forecast["yhat"].iloc[0])
+            actual = frames[asset].last_price
+            module.save_result(asset, prediction, actual, abs(actual - prediction))
+            module.save_forecast(asset, forecast)
+        return module.flush_results()
+
+    bench.run("cloud_store.flush", lambda: store(cloud_store), rows=n_assets)
+    bench.run("local_store.flush", lambda: store(local_store), rows=n_assets)
+
+    # ---- Append validated results (30 days beyond the history) ----
+    validated = forecast_results(wide)
+    supabase.table("forecast_results").upsert(validated, on_conflict="date,asset").execute()
+    bench.run(
+        "append_validated_history",
+        append_validated_history.append_validated_history,
+        rows=len(validated)
+    )
+
+    return bench.results
+
+
+def print_comparison(results, baseline_path):
+    with open(baseline_path) as f:
+        baseline = {
+            (r["size"], r["benchmark"]): r["seconds"] for r in json.load(f)
+        }
+
+    print("\n==============================")
+    print(f"Against baseline {baseline_path}")
+    print("==============================")
+
+    for r in results:
+        before = baseline.get((r["size"], r["benchmark"]))
+        if before:
+            print(
+                f"{r['size']:<8} {r['benchmark']:<32} "
+                f"{before:9.3f}s -> {r['seconds']:9.3f}s  x{before / r['seconds']:.2f}"
+            )
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Offline performance benchmarks")
+    parser.add_argument(
+        "--sizes",
+        nargs="*",
+        choices=list(SIZES),
+        default=DEFAULT_SIZES,
+        help=f"data sizes to run (default: {' '.join(DEFAULT_SIZES)})"
+    )
+    parser.add_argument(
+        "--latency",
+        type=float,
+        default=0.0,
+        help="seconds added to every fake Supabase request"
+    )
+    parser.add_argument(
+        "--no-prophet",
+        action="store_true",
+        help="skip the single-asset Prophet fit"
+    )
+    parser.add_argument(
+        "--output",
+        default=DEFAULT_OUTPUT,
+        help=f"results JSON, relative to the repo root (default: {DEFAULT_OUTPUT})"
+    )
+    parser.add_argument(
+        "--baseline",
+        default=None,
+        help="earlier results JSON to compare against"
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    output = os.path.join(ROOT, args.output)
+    baseline = os.path.join(ROOT, args.baseline) if args.baseline else None
+
+    results = []
+
+    with tempfile.TemporaryDirectory(prefix="forecast-bench-") as workdir:
+        cwd = os.getcwd()
+        _setup(workdir, args.latency)
+        try:
+            for size in args.sizes:
+                n_assets, n_rows = SIZES[size]
+                results.extend(run_size(size, n_assets, n_rows, prophet=not args.no_prophet))
+        finally:
+            os.chdir(cwd)
+
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(results, f, indent=2)
+
+    print(f"\nResults written to {output}")
+
+    if baseline:
+        print_comparison(results, baseline)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
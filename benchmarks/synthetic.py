@@ -0,0 +1,84 @@
+import numpy as np
+import pandas as pd
+
+# Synthetic commodity prices shaped like data/commodity_futures.csv:
+# one Date column plus one column per asset, business-day dates,
+# geometric random walks with missing stretches at the start (late
+# listings) and scattered single-day gaps.
+
+
+def asset_names(n_assets):
+    return [f"SYN_{i:03d}" for i in range(n_assets)]
+
+
+def generate_prices(n_assets, n_rows, seed=0, start="2000-01-03"):
+    """
+    Wide frame (Date, SYN_000, SYN_001, ...) with about n_rows non-null
+    prices in total, spread evenly over n_assets
+    """
+    rng = np.random.default_rng(seed)
+    n_dates = max(2, -(-n_rows // n_assets))
+
+    dates = pd.bdate_range(start, periods=n_dates)
+
+    start_price = rng.uniform(5, 2000, size=n_assets)
+    vol = rng.uniform(0.005, 0.03, size=n_assets)
+    drift = rng.normal(0.0002, 0.0002, size=n_assets)
+
+    steps = rng.normal(drift, vol, size=(n_dates, n_assets))
+    prices = start_price * np.exp(np.cumsum(steps, axis=0))
+
+    # ~0.5% scattered gaps
+    prices[rng.random(prices.shape) < 0.005] = np.nan
+
+    # Some assets list later than the first date
+    late = rng.random(n_assets) < 0.2
+    listing = rng.integers(0, max(1, n_dates // 4), size=n_assets)
+    for i in np.flatnonzero(late):
+        prices[:listing[i], i] = np.nan
+
+    df = pd.DataFrame(prices.round(4), columns=asset_names(n_assets))
+    df.insert(0, "Date", dates)
+
+    return df
+
+
+def asset_config(columns):
+    """
+    ASSET_CONFIG-style entries for synthetic columns
+    """
+    return {
+        column: {
+            "historical_column": column,
+            "live_symbol": column.lower(),
+            "engine": "holt_winters",
+        }
+        for column in columns
+    }
+
+
+def forecast_results(wide, days=30, seed=0):
+    """
+    forecast_results rows (date, asset, predicted_price, actual_price,
+    error) for `days` business days after the end of the wide frame
+    """
+    rng = np.random.default_rng(seed)
+    last = wide.iloc[-1, 1:].astype("float64").ffill()
+    dates = pd.bdate_range(wide["Date"].iloc[-1], periods=days + 1)[1:]
+
+    rows = []
+    for asset, price in last.items():
+        if np.isnan(price):
+            continue
+        actual = price * np.exp(np.cumsum(rng.normal(0, 0.01, size=days)))
+        predicted = actual * (1 + rng.normal(0, 0.01, size=days))
+        for d, a, p in zip(dates, actual, predicted):
+            rows.append({
+                "date": d.strftime("%Y-%m-%d"),
+                "asset": asset,
+                "predicted_price": float(p),
+                "actual_price": float(a),
+                "error": float(abs(a - p)),
+            })
+
+    return rows
@@ -1,74 +1,125 @@
-import os
 import pandas as pd
-from supabase import create_client
-from dotenv import load_dotenv
 
 from src.config.settings import ASSET_CONFIG
+from src.utils.pagination import fetch_all
+from src.utils.retry import retry_call
+from src.utils.supabase_client import create_supabase_client
 
-# Load environment variables
-load_dotenv()
+supabase = create_supabase_client()
 
-SUPABASE_URL = os.getenv("SUPABASE_URL")
-SUPABASE_KEY = os.getenv("SUPABASE_SERVICE_KEY")
+UPSERT_BATCH_SIZE = 1000  # rows per upsert request
 
-if not SUPABASE_URL or not SUPABASE_KEY:
-    raise ValueError("Supabase credentials not found")
 
-supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
+RESULT_COLUMNS = ["date", "asset", "actual_price"]
 
 
-def append_validated_history():
-    print("Starting weekly validated history append...")
+def load_watermarks(assets):
+    """
+    1. Latest price_history date per asset (None = no history yet).
 
-    for asset in ASSET_CONFIG.keys():
-        print(f"\nProcessing asset: {asset}")
+    One request to the price_history_latest view
+    (supabase/migrations/20261018120000_forecast_schema.sql), so the
+    cost grows neither with the number of assets nor with the history.
+    """
+    if not assets:
+        return {}
 
-        # 1. Get latest date already in price_history
-        history_resp = (
+    rows = fetch_all(
+        lambda count: (
             supabase
-            .table("price_history")
-            .select("date")
-            .eq("asset", asset)
-            .order("date", desc=True)
-            .limit(1)
-            .execute()
+            .table("price_history_latest")
+            .select("asset, date", count=count)
+            .in_("asset", assets)
+            .order("asset")
         )
+    )
+    latest = {row["asset"]: row["date"] for row in rows}
+
+    return {asset: latest.get(asset) for asset in assets}
+
+
+def load_validated_results(watermarks):
+    """
+    2. forecast_results rows with an actual price that are newer than
+    each asset's watermark (all rows for an asset without history).
+
+    One paginated select from the oldest watermark on; each asset is
+    then filtered against its own watermark in memory.
+    """
+    if not watermarks:
+        return pd.DataFrame(columns=RESULT_COLUMNS)
 
-        last_history_date = None
-        if history_resp.data:
-            last_history_date = history_resp.data[0]["date"]
+    known = [w for w in watermarks.values() if w is not None]
+    since = min(known) if len(known) == len(watermarks) else None
 
-        # 2. Fetch validated actual prices from forecast_results
+    def build_query(count):
         query = (
             supabase
             .table("forecast_results")
-            .select("date, actual_price")
-            .eq("asset", asset)
+            .select(", ".join(RESULT_COLUMNS), count=count)
+            .in_("asset", list(watermarks))
+            .not_.is_("actual_price", "null")
         )
+        if since is not None:
+            query = query.gt("date", since)
+        return query.order("date").order("asset")
+
+    results = pd.DataFrame(fetch_all(build_query), columns=RESULT_COLUMNS)
+
+    # ISO dates compare correctly as strings; no watermark keeps every row
+    watermark = results["asset"].map(watermarks).fillna("")
+    return results[results["date"].astype(str) > watermark].reset_index(drop=True)
+
+
+def upsert_rows(rows):
+    """
+    4. Write rows to price_history in UPSERT_BATCH_SIZE pages
+    """
+    for start in range(0, len(rows), UPSERT_BATCH_SIZE):
+        batch = rows[start:start + UPSERT_BATCH_SIZE]
+
+        # Requires a unique index on price_history (date, asset)
+        # (supabase/migrations/20261018120000_forecast_schema.sql)
+        retry_call(
+            lambda: (
+                supabase
+                .table("price_history")
+                .upsert(batch, on_conflict="date,asset")
+                .execute()
+            ),
+            attempts=4,
+            base_delay=1.0,
+            label="price_history upsert"
+        )
+
+
+def append_validated_history():
+    print("Starting weekly validated history append...")
+
+    assets = list(ASSET_CONFIG.keys())
 
-        if last_history_date:
-            query = query.gt("date", last_history_date)
+    watermarks = load_watermarks(assets)
 
-        results_resp = query.execute()
+    # 3. Only rows newer than each asset's watermark, one per (date, asset)
+    new = load_validated_results(watermarks)
+    new = new.drop_duplicates(subset=["date", "asset"], keep="last")
 
-        if not results_resp.data:
-            print("No new validated data to append.")
-            continue
+    if new.empty:
+        print("No new validated data to append.")
+        return
 
-        # 3. Prepare rows for insertion
-        rows = []
-        for row in results_resp.data:
-            rows.append({
-                "date": row["date"],
-                "asset": asset,
-                "price": row["actual_price"],
-                "source": "validated_forecast"
-            })
+    rows = (
+        new
+        .rename(columns={"actual_price": "price"})
+        .assign(source="validated_forecast")
+        [["date", "asset", "price", "source"]]
+        .to_dict(orient="records")
+    )
 
-        # 4. Insert into price_history
-        supabase.table("price_history").insert(rows).execute()
+    upsert_rows(rows)
 
-        print(f"Appended {len(rows)} rows to price_history")
+    for asset, count in new["asset"].value_counts().sort_index().items():
+        print(f"Appended {count} rows to price_history for {asset}")
 
     print("\nWeekly append completed.")
 
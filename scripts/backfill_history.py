@@ -1,65 +1,209 @@
+import argparse
+import hashlib
+import json
 import os
+import sys
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
 import pandas as pd
-from supabase import create_client
-from dotenv import load_dotenv
 
-from src.config.settings import ASSET_CONFIG
+# src/ modules import each other as top-level packages (data.…, config.…)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+from src.config.settings import ASSET_CONFIG, HISTORICAL_FILE
+from src.data.history_loader import asset_name_for, available_columns, read_columns
+from src.utils.retry import retry_call
+from src.utils.supabase_client import create_supabase_client
+
+supabase = create_supabase_client()
+
+CHECKPOINT_FILE = "data/.backfill_checkpoint.json"
+
+BATCH_SIZE = 500      # rows per upsert request
+CONCURRENCY = 4       # upsert requests in flight
+MAX_RETRIES = 5       # attempts per batch after the first
+
+
+def select_assets(all_columns=False):
+    """
+    dict asset -> historical column to backfill
+    (ASSET_CONFIG assets, plus every other commodity in the file with --all)
+    """
+    assets = {
+        asset: info["historical_column"]
+        for asset, info in ASSET_CONFIG.items()
+    }
+
+    if all_columns:
+        configured = set(assets.values())
+        for column in available_columns(HISTORICAL_FILE):
+            if column not in configured:
+                assets[asset_name_for(column)] = column
+
+    return assets
+
+
+# ================== CHECKPOINT ==================
+# Batches are deterministic for a given file + batch size, so the
+# checkpoint just records which batch ids were already written.
+
+def source_fingerprint():
+    h = hashlib.sha256()
+    with open(HISTORICAL_FILE, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    h.update(str(BATCH_SIZE).encode())
+    return h.hexdigest()
+
+
+def load_checkpoint(fingerprint):
+    if not os.path.exists(CHECKPOINT_FILE):
+        return set()
+
+    try:
+        with open(CHECKPOINT_FILE) as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return set()
 
-# Load environment variables
-load_dotenv()
+    if state.get("fingerprint") != fingerprint:
+        print("Source file or batch size changed, ignoring checkpoint.")
+        return set()
 
-SUPABASE_URL = os.getenv("SUPABASE_URL")
-SUPABASE_KEY = os.getenv("SUPABASE_SERVICE_KEY")
+    return set(state.get("done", []))
 
-if not SUPABASE_URL or not SUPABASE_KEY:
-    raise ValueError("Supabase credentials not found")
 
-supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
+def save_checkpoint(fingerprint, done):
+    tmp_path = CHECKPOINT_FILE + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump({"fingerprint": fingerprint, "done": sorted(done)}, f)
+    os.replace(tmp_path, CHECKPOINT_FILE)
 
-HISTORICAL_FILE = "data/commodity_futures.csv"
 
+# ================== BATCHES ==================
 
-def backfill_history():
+def iter_batches(assets):
+    """
+    Yield (batch_id, rows) for every asset, BATCH_SIZE rows at a time.
+    Dates are formatted once for the whole file and each chunk is
+    serialised with a single vectorized to_json call.
+    """
+    df = read_columns(HISTORICAL_FILE, list(assets.values()))
+
+    # Convert pandas Timestamp → string (JSON-safe), once for all assets
+    dates = df["date"].dt.strftime("%Y-%m-%d")
+
+    for asset, column in assets.items():
+        prices = df[column]
+        valid = prices.notna()
+
+        asset_df = pd.DataFrame({
+            "date": dates[valid],
+            "asset": asset,
+            "price": prices[valid],
+            "source": "historical_csv",
+        })
+
+        for i, start in enumerate(range(0, len(asset_df), BATCH_SIZE)):
+            chunk = asset_df.iloc[start:start + BATCH_SIZE]
+            yield f"{asset}:{i}", json.loads(chunk.to_json(orient="records"))
+
+
+def upsert_batch(batch_id, rows):
+    # Requires a unique index on price_history (date, asset)
+    # (supabase/migrations/20261018120000_forecast_schema.sql)
+    retry_call(
+        lambda: (
+            supabase
+            .table("price_history")
+            .upsert(rows, on_conflict="date,asset")
+            .execute()
+        ),
+        attempts=MAX_RETRIES + 1,
+        base_delay=1.0,
+        label=f"Batch {batch_id}"
+    )
+    return len(rows)
+
+
+def backfill_history(all_columns=False, restart=False):
     print("Starting historical backfill...")
 
-    df = pd.read_csv(HISTORICAL_FILE)
+    assets = select_assets(all_columns)
+    print(f"Assets: {list(assets)}")
+
+    fingerprint = source_fingerprint()
+    done = set() if restart else load_checkpoint(fingerprint)
+    if done:
+        print(f"Resuming: {len(done)} batches already written.")
+
+    inserted = 0
+    in_flight = {}
+
+    # Keep at most 2 × CONCURRENCY batches serialised ahead of the
+    # uploads, so serialisation overlaps with the network round trips
+    with ThreadPoolExecutor(max_workers=CONCURRENCY) as pool:
+        for batch_id, rows in iter_batches(assets):
+            if batch_id in done:
+                continue
+
+            in_flight[pool.submit(upsert_batch, batch_id, rows)] = batch_id
+
+            if len(in_flight) >= 2 * CONCURRENCY:
+                inserted += _collect(in_flight, done, fingerprint, FIRST_COMPLETED)
+
+        inserted += _collect(in_flight, done, fingerprint)
+
+    print(f"\nUpserted {inserted} rows.")
+
+    # Everything written: next run starts from scratch
+    if os.path.exists(CHECKPOINT_FILE):
+        os.remove(CHECKPOINT_FILE)
 
-    # Normalize date column
-    if "Date" in df.columns:
-        df["date"] = pd.to_datetime(df["Date"])
-    elif "date" in df.columns:
-        df["date"] = pd.to_datetime(df["date"])
-    else:
-        raise ValueError("No Date column found in historical CSV")
+    print("Historical backfill completed.")
 
-    for asset, asset_info in ASSET_CONFIG.items():
-        print(f"\nBackfilling asset: {asset}")
 
-        column = asset_info["historical_column"]
+def _collect(in_flight, done, fingerprint, return_when="ALL_COMPLETED"):
+    """
+    Wait for in-flight batches, checkpoint the finished ones.
+    A batch that exhausted its retries aborts the run (the checkpoint
+    keeps everything written so far).
+    """
+    finished, _ = wait(in_flight, return_when=return_when)
+    count = 0
+    error = None
 
-        if column not in df.columns:
-            print(f"Column {column} not found, skipping.")
-            continue
+    for future in finished:
+        batch_id = in_flight.pop(future)
+        try:
+            count += future.result()
+            done.add(batch_id)
+        except Exception as exc:
+            error = error or exc
 
-        asset_df = df[["date", column]].dropna()
-        asset_df = asset_df.rename(columns={column: "price"})
-        # Convert pandas Timestamp → string (JSON-safe)
-        asset_df["date"] = asset_df["date"].dt.strftime("%Y-%m-%d")
-        asset_df["asset"] = asset
-        asset_df["source"] = "historical_csv"
+    save_checkpoint(fingerprint, done)
 
-        rows = asset_df.to_dict(orient="records")
+    if error is not None:
+        raise error
 
-        # Insert in batches to avoid limits
-        batch_size = 500
-        for i in range(0, len(rows), batch_size):
-            batch = rows[i:i + batch_size]
-            supabase.table("price_history").insert(batch).execute()
+    return count
 
-        print(f"Inserted {len(rows)} rows for {asset}")
 
-    print("\nHistorical backfill completed.")
+def parse_args():
+    parser = argparse.ArgumentParser(description="Backfill price_history")
+    parser.add_argument(
+        "--all",
+        action="store_true",
+        help="backfill every commodity column, not only ASSET_CONFIG"
+    )
+    parser.add_argument(
+        "--restart",
+        action="store_true",
+        help="ignore the checkpoint and upsert every batch again"
+    )
+    return parser.parse_args()
 
 
 if __name__ == "__main__":
-    backfill_history()
+    args = parse_args()
+    backfill_history(all_columns=args.all, restart=args.restart)
@@ -0,0 +1,26 @@
+import glob
+import os
+import sys
+
+# src/ modules import each other as top-level packages (data.…, config.…)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+from src.data.history_loader import convert_to_columnar
+
+HISTORICAL_FILES = ["data/commodity_futures.csv"] + sorted(
+    glob.glob("data/history_*.csv")
+)
+
+
+def convert_history():
+    print("Converting historical CSV files to Parquet...")
+
+    for csv_path in HISTORICAL_FILES:
+        path = convert_to_columnar(csv_path)
+        print(f"{csv_path} -> {path}")
+
+    print("\nConversion completed.")
+
+
+if __name__ == "__main__":
+    convert_history()
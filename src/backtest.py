@@ -0,0 +1,196 @@
+import argparse
+import os
+import sys
+import time
+
+import pandas as pd
+
+from config.settings import ASSET_CONFIG, MAX_WORKERS, TRAINING_POLICIES
+
+from data.history_loader import load_historical_assets
+from processing.quality import clean_histories
+from model.forecaster import BATCH_ENGINES, SERIES_ENGINES, engine_for
+from model.training_policy import policy_for
+from evaluation.backtest import run_backtest
+from evaluation.metrics import error_table
+
+DEFAULT_OUTPUT = "data/backtest_results.csv"
+
+
+def load_frames(assets, source):
+    """
+    Cleaned (date, price) history per asset from the local historical
+    file ("local", offline) or Supabase price_history ("cloud")
+    """
+    if source == "cloud":
+        from data.cloud_history_loader import load_cloud_histories
+        histories = load_cloud_histories(list(assets))
+    else:
+        histories = load_historical_assets(assets)
+
+    cleaned, _ = clean_histories(histories)
+
+    return {asset: series.to_frame() for asset, series in cleaned.items()}
+
+
+def error_summary(results):
+    """
+    evaluation.metrics.error_table per (asset, engine, policy), with
+    the mean fit time per cutoff
+    """
+    parts = []
+
+    for (engine, policy), group in results.groupby(["engine", "policy"]):
+        table = error_table(group, date="target_date")
+        table["fit_seconds"] = group.groupby("asset")["fit_seconds"].mean()
+        parts.append(table.reset_index().assign(engine=engine, policy=policy))
+
+    return pd.concat(parts, ignore_index=True).sort_values(["asset", "engine", "policy"])
+
+
+def print_report(summary):
+    print("\n==============================")
+    print("Backtest summary")
+    print("==============================")
+
+    for row in summary.itertuples(index=False):
+        print(
+            f"{row.asset:<15} {row.engine:<15} {row.policy:<15} cutoffs={row.count:<5} "
+            f"MAE={row.mae:.4f}  RMSE={row.rmse:.4f}  MAPE={row.mape:.2f}%  "
+            f"bias={row.bias:+.4f}  direction={row.directional_accuracy:.1f}%  "
+            f"fit={row.fit_seconds:.2f}s/cutoff"
+        )
+
+
+def print_policy_report(summary):
+    """
+    Fit time against backtest error for each training policy
+    """
+    print("\n==============================")
+    print("Training policy benchmark")
+    print("==============================")
+
+    table = summary.pivot_table(
+        index="policy", columns="asset", values=["mae", "mape", "fit_seconds"]
+    )
+    table[("fit_seconds", "ALL")] = summary.groupby("policy")["fit_seconds"].mean()
+    table = table.sort_index(axis=1, level=0, sort_remaining=False)
+
+    print(table.round(4).to_string())
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Walk-forward backtest")
+    parser.add_argument(
+        "--cutoffs",
+        type=int,
+        default=250,
+        help="daily cutoffs per asset, counted back from the latest date"
+    )
+    parser.add_argument(
+        "--engine",
+        default=None,
+        choices=sorted({*BATCH_ENGINES, *SERIES_ENGINES}),
+        help="engine for every asset (default: per-asset ASSET_CONFIG engine)"
+    )
+    parser.add_argument(
+        "--assets",
+        nargs="*",
+        default=None,
+        help="subset of ASSET_CONFIG assets (default: all)"
+    )
+    parser.add_argument(
+        "--policies",
+        nargs="*",
+        default=None,
+        choices=list(TRAINING_POLICIES),
+        help="benchmark these Prophet training policies against each other "
+             "(default: per-asset ASSET_CONFIG policy)"
+    )
+    parser.add_argument(
+        "--source",
+        choices=["local", "cloud"],
+        default="local",
+        help="history source (default: local historical CSV/Parquet)"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=MAX_WORKERS,
+        help="worker processes (default: settings.MAX_WORKERS)"
+    )
+    parser.add_argument(
+        "--cache",
+        action="store_true",
+        help="read and write cached model artifacts (shared with the "
+             "daily run, whose models it can evict)"
+    )
+    parser.add_argument(
+        "--output",
+        default=DEFAULT_OUTPUT,
+        help=f"results CSV (default: {DEFAULT_OUTPUT})"
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    names = args.assets or list(ASSET_CONFIG)
+    assets = {name: ASSET_CONFIG[name] for name in names}
+
+    engines = {
+        name: args.engine or engine_for(info)
+        for name, info in assets.items()
+    }
+
+    workers = args.workers or os.cpu_count() or 1
+
+    print(f"Backtesting {list(assets)} over {args.cutoffs} cutoffs")
+    print(f"Engines: {engines}")
+    print(f"Worker processes: {workers}")
+
+    started = time.perf_counter()
+
+    frames = load_frames(assets, args.source)
+
+    # One backtest per policy under comparison, else the configured ones
+    if args.policies:
+        runs = {
+            name: {asset: name for asset in assets}
+            for name in args.policies
+        }
+    else:
+        runs = {None: {asset: policy_for(info) for asset, info in assets.items()}}
+
+    parts = []
+    for name, policies in runs.items():
+        if name is not None:
+            print(f"\nPolicy: {name} {TRAINING_POLICIES[name]}")
+
+        part = run_backtest(
+            frames,
+            engines,
+            args.cutoffs,
+            workers=workers,
+            use_cache=args.cache,
+            policies=policies
+        )
+        part.insert(2, "policy", name or "configured")
+        parts.append(part)
+
+    results = pd.concat(parts, ignore_index=True)
+    results.to_csv(args.output, index=False)
+
+    summary = error_summary(results)
+    print_report(summary)
+    if args.policies:
+        print_policy_report(summary)
+    print(f"\n{len(results)} forecasts in {time.perf_counter() - started:.1f}s")
+    print(f"Results written to {args.output}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
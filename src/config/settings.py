@@ -6,31 +6,156 @@
 DATA_FREQUENCY = "daily"
 
 # Prediction setup
-PREDICTION_HORIZON = 1  # one-step ahead (tomorrow)
+# Every step 1..PREDICTION_HORIZON is forecast from one fit and stored;
+# step 1 (next trading day) is the prediction that gets evaluated
+PREDICTION_HORIZON = 1
+HORIZON_FREQ = "B"  # one forecast step = one business day (as QUALITY_CALENDAR)
+
+# Simulated trend paths behind yhat_lower / yhat_upper (Prophet default
+# 1000); only the forecast rows are sampled. 0 = point forecasts only
+FORECAST_UNCERTAINTY_SAMPLES = 1000
 
 # Model config (baseline for now)
 MODEL_NAME = "time_series_baseline"
 
+# Forecasting engine used when an asset has no "engine" key.
+# "prophet" fits one model per asset; "naive", "seasonal_naive",
+# "ewma" and "holt_winters" are vectorized baselines that forecast
+# all their assets in a single batch
+DEFAULT_ENGINE = "prophet"
+
+# Keyword arguments for the baseline engines
+BASELINE_PARAMS = {
+    "seasonal_naive": {"season_length": 5},
+    "ewma": {"alpha": 0.3},
+    "holt_winters": {
+        "alpha": 0.3,
+        "beta": 0.05,
+        "gamma": 0.1,
+        "season_length": 5,
+        "window": 520,
+    },
+}
+
+# Prophet training policies
+# Bound how much history each fit sees. Keys (all optional):
+#   window_years     - only train on the trailing N years (None = all)
+#   daily_years      - keep the last N years daily, aggregate older rows
+#   tail_resolution  - pandas frequency for the aggregated tail ("W" = weekly)
+#   n_changepoints   - cap on Prophet's potential changepoints (default 25)
+# Window and resolution boundaries snap to month starts, so the training
+# start only moves once a month and warm starts keep working.
+# ASSET_CONFIG "training_policy" takes a name from here or an inline dict;
+# assets without one use DEFAULT_TRAINING_POLICY. Opt an asset into a
+# cheaper policy only after `python src/backtest.py --policies full <name>`
+# shows no loss for that asset (compact is much faster but can be far
+# worse, e.g. on NATURAL_GAS).
+TRAINING_POLICIES = {
+    "full": {},
+    "trailing_10y": {"window_years": 10},
+    "weekly_tail": {"daily_years": 3, "tail_resolution": "W"},
+    "compact": {
+        "window_years": 10,
+        "daily_years": 3,
+        "tail_resolution": "W",
+        "n_changepoints": 15,
+    },
+}
+DEFAULT_TRAINING_POLICY = "full"
+
+# Warm start
+# Fitted Prophet parameters are saved per asset and reused as the
+# Stan initialisation on the next run, unless the history changed a lot
+WARM_START_ENABLED = True
+WARM_START_DIR = "data/model_state"
+WARM_START_MAX_NEW_ROWS = 30        # more new rows than this → cold fit
+WARM_START_MAX_SCALE_CHANGE = 0.10  # relative change in price level → cold fit
+
+# Model artifact cache
+# Fitted models keyed by a hash of the training data + model config,
+# so identical inputs (e.g. manual reruns) skip the fit entirely
+MODEL_CACHE_ENABLED = True
+MODEL_CACHE_DIR = "data/model_cache"
+MODEL_CACHE_MAX_BYTES = 200 * 1024 * 1024
+MODEL_CACHE_MAX_AGE_DAYS = 14
+
+# Local price_history cache
+# Per-asset Parquet copies of Supabase price_history; each run only
+# downloads rows newer than the cached watermark
+HISTORY_CACHE_ENABLED = True
+HISTORY_CACHE_DIR = "data/cache/price_history"
+HISTORY_FULL_RESYNC_DAYS = 7  # full re-download at least this often
+
+# price_history is read in pages of HISTORY_PAGE_SIZE rows (must not
+# exceed the PostgREST max-rows setting), several pages at a time
+HISTORY_PAGE_SIZE = 1000
+HISTORY_PAGE_CONCURRENCY = 4
+
+# Data quality (processing/quality.py), run on all assets at once
+QUALITY_CALENDAR = "B"        # reindex to this pandas frequency (None = observed dates only)
+QUALITY_FFILL_LIMIT = 5       # max consecutive missing rows forward-filled
+QUALITY_MAD_WINDOW = 63       # trailing rows for the rolling MAD of daily jumps
+QUALITY_MAD_MIN_PERIODS = 10  # fewer valid rows in the window → no outlier test
+QUALITY_MAD_THRESHOLD = 8.0   # robust z-score above which an isolated spike is masked
+QUALITY_MAD_FLOOR = 0.005     # jump scale never below this relative move
+
+# Live price fetch (API-Ninjas)
+FETCH_TIMEOUT = (3.05, 10)  # (connect, read) seconds per request
+FETCH_MAX_RETRIES = 3       # retries on 429 / 5xx / connection errors
+FETCH_BACKOFF_BASE = 0.5    # seconds, doubled per retry (with jitter)
+FETCH_CONCURRENCY = 8       # symbols fetched at the same time
+
+# Forecast results
+# "cloud" = Supabase forecast_results, "local" = SQLite data/results.db
+RESULTS_BACKEND = "cloud"
+RESULTS_BATCH_SIZE = 500          # rows per upsert request
+RESULTS_FLUSH_RETRIES = 3
+RESULTS_FLUSH_BACKOFF_BASE = 1.0  # seconds
+
+# Error alerting
+# Warn when an asset's rolling MAPE (last evaluation.metrics.ROLLING_WINDOW
+# results) exceeds this many percent
+ERROR_ALERT_MAPE = 5.0
+
+# Asset discovery (main.py --discover)
+# Commodities found in HISTORICAL_FILE or in price_history but missing
+# from ASSET_CONFIG are forecast with these settings (no live price)
+HISTORICAL_FILE = "data/commodity_futures.csv"
+DISCOVERED_ASSET_DEFAULTS = {
+    "engine": DEFAULT_ENGINE,
+}
+
+# Parallel execution
+# Worker processes used by main.py to run assets side by side.
+# None = one per CPU core (capped at the number of assets), 1 = serial run
+MAX_WORKERS = None
+
 # Asset Configuration
 
 # This is the SINGLE source of truth
 # for all commodities in the system
+# ("engine" is optional and defaults to DEFAULT_ENGINE,
+#  "training_policy" is optional and defaults to DEFAULT_TRAINING_POLICY)
 
 ASSET_CONFIG = {
     "GOLD": {
         "historical_column": "GOLD",
-        "live_symbol": "micro_gold"
+        "live_symbol": "micro_gold",
+        "engine": "prophet"
     },
     "SILVER": {
         "historical_column": "SILVER",
-        "live_symbol": "micro_silver"
+        "live_symbol": "micro_silver",
+        "engine": "prophet"
     },
     "NATURAL_GAS": {
         "historical_column": "NATURAL GAS",
-        "live_symbol": "natural_gas"
+        "live_symbol": "natural_gas",
+        "engine": "prophet"
     },
     "LIVE_CATTLE": {
         "historical_column": "LIVE CATTLE",
-        "live_symbol": "live_cattle"
+        "live_symbol": "live_cattle",
+        "engine": "prophet"
     }
 }
@@ -1,23 +1,27 @@
 import streamlit as st
 import pandas as pd
 import plotly.express as px
+import plotly.graph_objects as go
 import os
-from supabase import create_client
-from dotenv import load_dotenv
+import sys
 from datetime import timedelta
 
-# ================== CONFIG ==================
-load_dotenv()
+# `streamlit run src/dashboard/app.py` → make src/ importable (like main.py)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-SUPABASE_URL = os.getenv("SUPABASE_URL")
-SUPABASE_KEY = os.getenv("SUPABASE_SERVICE_KEY")
+from config.settings import ASSET_CONFIG, ERROR_ALERT_MAPE
+from dashboard.charts import CHART_WIDTH_PX, line_chart
+from dashboard.store import LazyHistoryStore, SeriesStore
+from utils.pagination import fetch_all
+from utils.supabase_client import create_supabase_client
 
-if not SUPABASE_URL or not SUPABASE_KEY:
+# ================== CONFIG ==================
+try:
+    supabase = create_supabase_client()
+except ValueError:
     st.error("Supabase credentials not found")
     st.stop()
 
-supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
-
 st.set_page_config(
     page_title="Commodity Forecast Dashboard",
     layout="wide"
@@ -27,16 +31,21 @@ st.title("📊 Commodity Forecast Dashboard")
 st.caption("Historical prices, daily forecasts, and error analysis")
 
 # ================== DATA LOADERS ==================
+# Cached loaders and stores are shared by every session of this
+# server process, so each slice of data is downloaded once per TTL.
+
 @st.cache_data(ttl=300)
 def load_forecast_results():
-    res = (
-        supabase
-        .table("forecast_results")
-        .select("*")
-        .order("date", desc=False)
-        .execute()
+    rows = fetch_all(
+        lambda count: (
+            supabase
+            .table("forecast_results")
+            .select("*", count=count)
+            .order("date", desc=False)
+            .order("asset")
+        )
     )
-    df = pd.DataFrame(res.data)
+    df = pd.DataFrame(rows)
     if not df.empty:
         df["date"] = pd.to_datetime(df["date"], errors="coerce")
         df = df.dropna(subset=["date"])
@@ -44,31 +53,88 @@ def load_forecast_results():
 
 
 @st.cache_data(ttl=300)
-def load_price_history():
-    all_rows = []
-    batch_size = 1000
-    start = 0
-
-    while True:
-        res = (
-            supabase
-            .table("price_history")
-            .select("date, asset, price")
-            .range(start, start + batch_size - 1)
-            .execute()
+def load_error_stats():
+    # One precomputed row per asset, maintained by the forecast run
+    res = (
+        supabase
+        .table("forecast_error_stats")
+        .select(
+            "asset, count, mae, rmse, mape, smape, bias, "
+            "directional_accuracy, rolling_mae, rolling_mape"
         )
+        .execute()
+    )
+    if not res.data:
+        return pd.DataFrame()
+    return pd.DataFrame(res.data).set_index("asset", drop=False)
 
-        if not res.data:
-            break
 
-        all_rows.extend(res.data)
+@st.cache_data(ttl=300)
+def load_latest_forecasts(asset):
+    # Every horizon of the asset's most recent run
+    latest = (
+        supabase
+        .table("forecast_horizons")
+        .select("run_date")
+        .eq("asset", asset)
+        .order("run_date", desc=True)
+        .limit(1)
+        .execute()
+    )
+    if not latest.data:
+        return pd.DataFrame()
+
+    res = (
+        supabase
+        .table("forecast_horizons")
+        .select("run_date, horizon, target_date, yhat, yhat_lower, yhat_upper")
+        .eq("asset", asset)
+        .eq("run_date", latest.data[0]["run_date"])
+        .order("horizon")
+        .execute()
+    )
+    df = pd.DataFrame(res.data or [])
+    if not df.empty:
+        df["target_date"] = pd.to_datetime(df["target_date"])
+    return df
 
-        if len(res.data) < batch_size:
-            break
 
-        start += batch_size
+@st.cache_data(ttl=300)
+def load_latest_history_date(asset):
+    res = (
+        supabase
+        .table("price_history")
+        .select("date")
+        .eq("asset", asset)
+        .order("date", desc=True)
+        .limit(1)
+        .execute()
+    )
+    if not res.data:
+        return None
+    return pd.to_datetime(res.data[0]["date"])
+
+
+def fetch_price_history(asset, start_date=None, before=None):
+    """
+    price_history for one asset with start_date <= date < before
+    (ISO strings, None = unbounded). Asset and date filters run in
+    Supabase; pages are fetched concurrently.
+    """
+    def build_query(count):
+        query = (
+            supabase
+            .table("price_history")
+            .select("date, price", count=count)
+            .eq("asset", asset)
+        )
+        if start_date is not None:
+            query = query.gte("date", start_date)
+        if before is not None:
+            query = query.lt("date", before)
+        return query.order("date")
 
-    df = pd.DataFrame(all_rows)
+    df = pd.DataFrame(fetch_all(build_query), columns=["date", "price"])
 
     df["date"] = pd.to_datetime(df["date"], errors="coerce")
     df = df.dropna(subset=["date"])
@@ -76,12 +142,25 @@ def load_price_history():
     return df
 
 
+@st.cache_resource(ttl=300)
+def get_history_store():
+    # Filled lazily per asset by fetch_price_history
+    return LazyHistoryStore(fetch_price_history)
+
+
+@st.cache_resource(ttl=300)
+def get_forecast_store():
+    # Grouped by asset once, then sliced by every session
+    return SeriesStore.from_frame(
+        load_forecast_results(),
+        ["predicted_price", "actual_price", "error"]
+    )
+
 
-forecast_df = load_forecast_results()
-history_df = load_price_history()
+forecast_store = get_forecast_store()
 
 
-if forecast_df.empty or history_df.empty:
+if not forecast_store.assets:
     st.warning("Data not available yet.")
     st.stop()
 
@@ -97,20 +176,32 @@ RANGE_MAP = {
     "All Available": None,
 }
 
-def apply_history_range(df: pd.DataFrame, days: int | None):
+def history_start_date(selected_assets, days: int | None):
+    """
+    First date to load for a range: `days` before the latest
+    price among the selected assets (None = full history)
+    """
     if days is None:
-        return df.sort_values("date")
-    
-    
-    from datetime import datetime
-    latest_date = df["date"].max()
-    cutoff_date = latest_date - timedelta(days=days)
-    
-    filtered = df[df["date"] >= cutoff_date].copy()
-    return filtered.sort_values("date")
+        return None
 
+    latest = [load_latest_history_date(a) for a in selected_assets]
+    latest = [d for d in latest if d is not None]
 
-assets = sorted(history_df["asset"].unique())
+    if not latest:
+        return None
+
+    cutoff_date = max(latest) - timedelta(days=days)
+    return cutoff_date.strftime("%Y-%m-%d")
+
+
+PRICE_FORMAT = st.column_config.NumberColumn(format="$%.2f")
+
+def fmt(value, pattern):
+    return "—" if value is None or pd.isna(value) else pattern.format(value)
+
+
+assets = sorted(set(ASSET_CONFIG) | set(forecast_store.assets))
+error_stats = load_error_stats()
 
 # ================== SIDEBAR ==================
 st.sidebar.header("Controls")
@@ -126,20 +217,23 @@ mode = st.sidebar.radio(
 if mode == "Single Asset":
     asset = st.sidebar.selectbox("Select Asset", assets)
 
-    asset_forecast = (
-        forecast_df[forecast_df["asset"] == asset]
-        .sort_values("date")
-        .reset_index(drop=True)
-    )
+    # Pre-grouped, date-sorted slice (no full-frame mask)
+    asset_forecast = forecast_store.slice(asset)
+
+    if asset_forecast.empty:
+        st.info(f"No forecasts for {asset} yet.")
+        st.stop()
 
     selected_date = st.sidebar.selectbox(
         "Select Forecast Date",
-        asset_forecast["date"].dt.date.unique()[::-1],
+        pd.DatetimeIndex(forecast_store.dates(asset)).normalize().unique()[::-1].date,
     )
 
-    row = asset_forecast[
-        asset_forecast["date"].dt.date == selected_date
-    ].iloc[0]
+    # First forecast on the selected day (binary search)
+    day = forecast_store.slice(
+        asset, selected_date, pd.Timestamp(selected_date) + pd.Timedelta(days=1)
+    )
+    row = day.iloc[0]
 
     # ---- KPIs ----
     c1, c2, c3, c4 = st.columns(4)
@@ -148,6 +242,23 @@ if mode == "Single Asset":
     c3.metric("Absolute Error", f"${row.error:.2f}")
     c4.metric("Error %", f"{(row.error / row.actual_price) * 100:.2f}%")
 
+    # ---- RUNNING ERROR KPIs (precomputed per asset) ----
+    if asset in error_stats.index:
+        kpi = error_stats.loc[asset]
+
+        k1, k2, k3, k4, k5 = st.columns(5)
+        k1.metric("MAE", fmt(kpi.mae, "${:.2f}"))
+        k2.metric("RMSE", fmt(kpi.rmse, "${:.2f}"))
+        k3.metric("MAPE", fmt(kpi.mape, "{:.2f}%"))
+        k4.metric("Direction Hit Rate", fmt(kpi.directional_accuracy, "{:.0f}%"))
+        k5.metric("Rolling MAPE", fmt(kpi.rolling_mape, "{:.2f}%"))
+
+        if pd.notna(kpi.rolling_mape) and kpi.rolling_mape > ERROR_ALERT_MAPE:
+            st.warning(
+                f"Rolling MAPE for {asset} is {kpi.rolling_mape:.2f}% "
+                f"(alert threshold {ERROR_ALERT_MAPE:.2f}%)"
+            )
+
     st.divider()
 
     # ---- ACTUAL vs PREDICTED ----
@@ -163,6 +274,28 @@ if mode == "Single Asset":
     fig.update_layout(yaxis_tickprefix="$", height=450)
     st.plotly_chart(fig, use_container_width=True)
 
+    # ---- FORECAST HORIZONS (latest run) ----
+    horizons = load_latest_forecasts(asset)
+
+    if not horizons.empty:
+        st.subheader(f"🔮 Forecast — next {len(horizons)} steps (run {horizons.run_date.iloc[0]})")
+
+        h_fig = go.Figure()
+        if horizons["yhat_lower"].notna().any():
+            h_fig.add_trace(go.Scatter(
+                x=pd.concat([horizons.target_date, horizons.target_date[::-1]]),
+                y=pd.concat([horizons.yhat_upper, horizons.yhat_lower[::-1]]),
+                fill="toself",
+                line={"width": 0},
+                opacity=0.25,
+                name="Interval",
+            ))
+        h_fig.add_trace(go.Scatter(
+            x=horizons.target_date, y=horizons.yhat, mode="lines+markers", name="Forecast"
+        ))
+        h_fig.update_layout(yaxis_tickprefix="$", height=350)
+        st.plotly_chart(h_fig, use_container_width=True)
+
     # ---- ERROR TREND ----
     st.subheader("📉 Error Over Time")
 
@@ -178,13 +311,14 @@ if mode == "Single Asset":
     # ---- PREDICTION TABLE (ADDED BACK) ----
     st.subheader("📋 Prediction History")
 
-    table_df = asset_forecast.copy()
-    table_df["Actual Price"] = table_df["actual_price"].map(lambda x: f"${x:.2f}")
-    table_df["Predicted Price"] = table_df["predicted_price"].map(lambda x: f"${x:.2f}")
-    table_df["Error"] = table_df["error"].map(lambda x: f"${x:.2f}")
-
+    # Formatted by the grid, not per row in Python
     st.dataframe(
-        table_df[["date", "Actual Price", "Predicted Price", "Error"]],
+        asset_forecast[["date", "actual_price", "predicted_price", "error"]],
+        column_config={
+            "actual_price": st.column_config.NumberColumn("Actual Price", format="$%.2f"),
+            "predicted_price": st.column_config.NumberColumn("Predicted Price", format="$%.2f"),
+            "error": st.column_config.NumberColumn("Error", format="$%.2f"),
+        },
         use_container_width=True,
     )
 
@@ -206,17 +340,39 @@ else:
 
     days = RANGE_MAP[range_label]
 
-    #  FILTER PER ASSET THEN RANGE
-    multi_hist = history_df[history_df["asset"].isin(selected_assets)].copy()
-    multi_hist = apply_history_range(multi_hist, days)
+    chart_width = st.sidebar.slider(
+        "Chart width (px)",
+        min_value=400,
+        max_value=4000,
+        value=CHART_WIDTH_PX,
+        step=100,
+        help="Points plotted per asset; match your screen width",
+    )
+
+    # Load only the selected assets and range (filtered in Supabase),
+    # then cut the range from the shared store with searchsorted
+    start_date = history_start_date(selected_assets, days)
+
+    history_store = get_history_store()
+    for a in selected_assets:
+        history_store.ensure(a, start_date)
+
+    multi_hist = history_store.frame(selected_assets, start=start_date)
+
+    if multi_hist.empty:
+        st.info("No price history for the selected assets.")
+        st.stop()
 
     st.subheader(f"📊 Price Trend — {range_label}")
 
-    fig = px.line(
+    # Downsampled to ~1 point per pixel of chart_width per asset (LTTB),
+    # WebGL if still large
+    fig = line_chart(
         multi_hist,
         x="date",
         y="price",
         color="asset",
+        n_out=chart_width,
         labels={"price": "Price ($)", "date": "Date"},
     )
     fig.update_layout(yaxis_tickprefix="$", height=500)
@@ -224,19 +380,25 @@ else:
 
     st.subheader("📋 Latest Forecast Snapshot")
 
-    latest = (
-        forecast_df
-        .sort_values("date")
-        .groupby("asset")
-        .tail(1)
-    )
+    latest = forecast_store.latest_rows()[["asset", "predicted_price", "actual_price", "error"]]
+
+    if not error_stats.empty:
+        latest = latest.merge(
+            error_stats[["asset", "mape", "rolling_mape", "directional_accuracy"]]
+            .reset_index(drop=True),
+            on="asset",
+            how="left",
+        )
 
     st.dataframe(
-        latest[["asset", "predicted_price", "actual_price", "error"]]
-        .assign(
-            predicted_price=lambda x: x.predicted_price.map(lambda v: f"${v:.2f}"),
-            actual_price=lambda x: x.actual_price.map(lambda v: f"${v:.2f}"),
-            error=lambda x: x.error.map(lambda v: f"${v:.2f}"),
-        ),
+        latest,
+        column_config={
+            "predicted_price": PRICE_FORMAT,
+            "actual_price": PRICE_FORMAT,
+            "error": PRICE_FORMAT,
+            "mape": st.column_config.NumberColumn("MAPE", format="%.2f%%"),
+            "rolling_mape": st.column_config.NumberColumn("Rolling MAPE", format="%.2f%%"),
+            "directional_accuracy": st.column_config.NumberColumn("Direction Hit Rate", format="%.0f%%"),
+        },
         use_container_width=True,
     )
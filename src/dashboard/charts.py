@@ -0,0 +1,133 @@
+import numpy as np
+import pandas as pd
+import plotly.express as px
+
+# Target points per series = chart width in pixels (one per horizontal
+# pixel). Streamlit does not report the rendered width, so this is an
+# assumed default (wide layout on a typical screen); app.py passes the
+# width chosen in the sidebar as n_out.
+CHART_WIDTH_PX = 1600
+
+# Above this many plotted points, draw with WebGL instead of SVG
+WEBGL_THRESHOLD = 5000
+
+
+def lttb_indices(x, y, n_out):
+    """
+    Largest-Triangle-Three-Buckets: indices of n_out points that keep
+    the visual shape of (x, y). x must be sorted ascending.
+    """
+    n = len(x)
+
+    # Not worth it (and buckets would be empty) below 2 points per bucket
+    if n <= 2 * n_out or n_out < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype="float64")
+    y = np.asarray(y, dtype="float64")
+
+    # First and last points are always kept; the rest is split into
+    # n_out - 2 buckets
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+
+    # Average of each bucket (used as the third triangle vertex)
+    sums_x = np.add.reduceat(x[1:n - 1], edges[:-1] - 1)
+    sums_y = np.add.reduceat(y[1:n - 1], edges[:-1] - 1)
+    counts = np.diff(edges)
+    avg_x = np.append(sums_x / counts, x[-1])
+    avg_y = np.append(sums_y / counts, y[-1])
+
+    a = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+
+        # Triangle area between the previous pick, each candidate in
+        # this bucket and the next bucket's average (×2, sign dropped)
+        area = np.abs(
+            (x[a] - avg_x[i + 1]) * (y[start:end] - y[a])
+            - (x[a] - x[start:end]) * (avg_y[i + 1] - y[a])
+        )
+
+        a = start + int(np.argmax(area))
+        selected[i + 1] = a
+
+    return selected
+
+
+def minmax_indices(y, n_out):
+    """
+    Min/max bucketing: the lowest and highest point of each of
+    n_out / 2 equal buckets (fully vectorized, keeps every spike)
+    """
+    n = len(y)
+    n_buckets = n_out // 2
+
+    if n_out >= n or n_buckets < 1:
+        return np.arange(n)
+
+    y = np.asarray(y, dtype="float64")
+    bucket = n // n_buckets
+    usable = bucket * n_buckets
+
+    blocks = y[:usable].reshape(n_buckets, bucket)
+    offsets = np.arange(n_buckets) * bucket
+
+    idx = np.concatenate([
+        offsets + np.nanargmin(blocks, axis=1),
+        offsets + np.nanargmax(blocks, axis=1),
+        np.arange(usable, n),  # leftover tail
+    ])
+
+    return np.unique(idx)
+
+
+def downsample(df, x, y, group=None, n_out=CHART_WIDTH_PX, method="lttb"):
+    """
+    Reduce each series (one per `group` value) to about n_out points.
+    df must be sorted by x within each group.
+    """
+    def pick(part):
+        xs = part[x].to_numpy()
+        ys = part[y].to_numpy(dtype="float64")
+
+        if method == "minmax":
+            idx = minmax_indices(ys, n_out)
+        else:
+            if np.issubdtype(xs.dtype, np.datetime64):
+                xs = xs.astype("datetime64[ns]").astype(np.int64)
+            idx = lttb_indices(xs, ys, n_out)
+
+        return part.iloc[idx]
+
+    if group is None:
+        return pick(df)
+
+    parts = [pick(part) for _, part in df.groupby(group, sort=False, observed=True)]
+
+    if not parts:
+        return df
+
+    return pd.concat(parts, ignore_index=True)
+
+
+def line_chart(df, x, y, color=None, n_out=CHART_WIDTH_PX, **kwargs):
+    """
+    px.line over a downsampled copy of df; switches to WebGL above
+    WEBGL_THRESHOLD points so render time stays flat for long ranges
+    """
+    plot_df = downsample(df, x, y, group=color, n_out=n_out)
+
+    render_mode = "webgl" if len(plot_df) > WEBGL_THRESHOLD else "svg"
+
+    return px.line(
+        plot_df,
+        x=x,
+        y=y,
+        color=color,
+        render_mode=render_mode,
+        **kwargs
+    )
@@ -0,0 +1,125 @@
+import streamlit as st
+import plotly.express as px
+import os
+import sys
+
+# `streamlit run src/dashboard/app.py` → make src/ importable
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from config.settings import RESULTS_BACKEND
+
+st.title("⏱️ Run Metrics")
+st.caption("Per-stage wall time, CPU time, memory and row counts of the daily runs")
+
+# ================== DATA LOADERS ==================
+# Runs store their metrics next to their results (main.py --store),
+# so read from the same backend
+
+backends = ["cloud", "local"]
+backend = st.sidebar.selectbox(
+    "Metrics store", backends, index=backends.index(RESULTS_BACKEND)
+)
+
+if backend == "cloud":
+    try:
+        from storage import cloud_store as store
+    except ValueError:
+        st.error("Supabase credentials not found")
+        st.stop()
+else:
+    from storage import local_store as store
+
+
+@st.cache_data(ttl=300)
+def load_run_metrics(backend, days):
+    return store.load_run_metrics(days)
+
+
+days = st.sidebar.slider("Days of history", 7, 180, 30)
+metrics = load_run_metrics(backend, days)
+
+if metrics.empty:
+    st.info("No run metrics recorded yet.")
+    st.stop()
+
+# Runs in start order, labelled by their first timestamp
+run_start = metrics.groupby("run_id")["started_at"].min().sort_values()
+metrics["run_start"] = metrics["run_id"].map(run_start)
+
+# ---- RUN TOTALS ----
+runs = (
+    metrics[metrics["stage"] == "run"]
+    .groupby("run_start", as_index=False)
+    .agg(wall_s=("wall_s", "sum"))
+    .merge(
+        metrics.groupby("run_start", as_index=False).agg(peak_rss_mb=("peak_rss_mb", "max")),
+        on="run_start",
+    )
+)
+
+c1, c2 = st.columns(2)
+
+with c1:
+    st.subheader("Run wall time")
+    fig = px.line(runs, x="run_start", y="wall_s", markers=True,
+                  labels={"wall_s": "Seconds", "run_start": "Run"})
+    st.plotly_chart(fig, use_container_width=True)
+
+with c2:
+    st.subheader("Peak RSS (any process)")
+    fig = px.line(runs, x="run_start", y="peak_rss_mb", markers=True,
+                  labels={"peak_rss_mb": "MB", "run_start": "Run"})
+    st.plotly_chart(fig, use_container_width=True)
+
+# ---- STAGE TRENDS ----
+st.subheader("Stage time per run")
+
+stages = sorted(set(metrics["stage"]) - {"run"})
+default = [s for s in ["load_history", "fetch_live", "fit", "predict", "store"] if s in stages]
+selected = st.multiselect("Stages", stages, default=default or stages[:5])
+
+# Stages nest (e.g. fit inside forecast), so compare stages, don't stack them
+per_stage = (
+    metrics[metrics["stage"].isin(selected)]
+    .groupby(["run_start", "stage"], as_index=False)
+    .agg(wall_s=("wall_s", "sum"), cpu_s=("cpu_s", "sum"))
+)
+
+fig = px.line(per_stage, x="run_start", y="wall_s", color="stage", markers=True,
+              labels={"wall_s": "Seconds (summed over assets)", "run_start": "Run"})
+st.plotly_chart(fig, use_container_width=True)
+
+# ---- HOT PATH OF ONE RUN ----
+st.subheader("Hot path")
+
+run_ids = list(run_start.index[::-1])
+run_id = st.selectbox(
+    "Run",
+    run_ids,
+    format_func=lambda r: f"{run_start[r]:%Y-%m-%d %H:%M} ({r})",
+)
+
+hot = (
+    metrics[(metrics["run_id"] == run_id) & (metrics["stage"] != "run")]
+    .fillna({"asset": "—"})
+    .groupby(["asset", "stage"], as_index=False)
+    .agg(
+        calls=("stage", "size"),
+        wall_s=("wall_s", "sum"),
+        cpu_s=("cpu_s", "sum"),
+        peak_rss_mb=("peak_rss_mb", "max"),
+        rows=("rows", "sum"),
+    )
+    .sort_values("wall_s", ascending=False)
+)
+
+st.dataframe(
+    hot,
+    column_config={
+        "wall_s": st.column_config.NumberColumn("Wall (s)", format="%.2f"),
+        "cpu_s": st.column_config.NumberColumn("CPU (s)", format="%.2f"),
+        "peak_rss_mb": st.column_config.NumberColumn("Peak RSS (MB)", format="%.0f"),
+    },
+    use_container_width=True,
+    hide_index=True,
+)
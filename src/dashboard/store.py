@@ -0,0 +1,194 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+# Compact, pre-indexed per-asset series for the dashboard.
+#
+# Each asset is stored once as date-sorted arrays (dates as int64 ns,
+# values as float32). Range cuts use searchsorted on the date array, so
+# a widget interaction costs O(log n + slice) instead of a boolean mask
+# over every row. One store is shared by all sessions via
+# st.cache_resource.
+
+
+def _as_ns(ts):
+    return pd.Timestamp(ts).value
+
+
+class SeriesStore:
+    def __init__(self, value_columns):
+        self.value_columns = list(value_columns)
+        # asset -> (dates, {column: values}); replaced as one tuple so
+        # readers never see dates and values from different versions
+        self._series = {}
+
+    @classmethod
+    def from_frame(cls, df, value_columns):
+        """
+        Build from a long frame (date, asset, *value_columns),
+        grouping by asset once
+        """
+        store = cls(value_columns)
+
+        if df.empty:
+            return store
+
+        df = df.sort_values(["asset", "date"], kind="stable")
+        assets = df["asset"].to_numpy()
+
+        # Start offset of each asset's block
+        starts = np.flatnonzero(np.r_[True, assets[1:] != assets[:-1]])
+        ends = np.r_[starts[1:], len(df)]
+
+        dates = df["date"].to_numpy(dtype="datetime64[ns]").view("int64")
+        values = {
+            c: df[c].to_numpy(dtype="float32") for c in store.value_columns
+        }
+
+        for start, end in zip(starts, ends):
+            store._series[assets[start]] = (
+                dates[start:end],
+                {c: v[start:end] for c, v in values.items()},
+            )
+
+        return store
+
+    def set_series(self, asset, df):
+        """
+        Replace one asset's series with the rows of df (date, *value_columns)
+        """
+        df = df.sort_values("date", kind="stable")
+
+        self._series[asset] = (
+            df["date"].to_numpy(dtype="datetime64[ns]").view("int64"),
+            {c: df[c].to_numpy(dtype="float32") for c in self.value_columns},
+        )
+
+    @property
+    def assets(self):
+        return sorted(self._series)
+
+    def __contains__(self, asset):
+        return asset in self._series
+
+    @staticmethod
+    def _bounds(dates, start=None, end=None):
+        lo = 0 if start is None else np.searchsorted(dates, _as_ns(start), "left")
+        hi = len(dates) if end is None else np.searchsorted(dates, _as_ns(end), "right")
+        return lo, hi
+
+    def slice(self, asset, start=None, end=None):
+        """
+        Rows of one asset with start <= date <= end, sorted by date
+        """
+        if asset not in self._series:
+            return pd.DataFrame(columns=["date", "asset"] + self.value_columns)
+
+        dates, values = self._series[asset]
+        lo, hi = self._bounds(dates, start, end)
+
+        data = {"date": dates[lo:hi].view("datetime64[ns]")}
+        data["asset"] = pd.Categorical([asset] * (hi - lo), categories=[asset])
+        for c in self.value_columns:
+            data[c] = values[c][lo:hi]
+
+        return pd.DataFrame(data)
+
+    def frame(self, assets, start=None, end=None):
+        """
+        Long frame for several assets (asset column is categorical)
+        """
+        parts = [self.slice(a, start, end) for a in assets if a in self._series]
+
+        if not parts:
+            return pd.DataFrame(columns=["date", "asset"] + self.value_columns)
+
+        df = pd.concat(parts, ignore_index=True)
+        df["asset"] = pd.Categorical(df["asset"].astype(str), categories=list(assets))
+
+        return df
+
+    def dates(self, asset):
+        """
+        Sorted dates of one asset (datetime64 array)
+        """
+        if asset not in self._series:
+            return np.array([], dtype="datetime64[ns]")
+        return self._series[asset][0].view("datetime64[ns]")
+
+    def row_at(self, asset, date):
+        """
+        Values at an exact date as a dict, or None
+        """
+        if asset not in self._series:
+            return None
+
+        dates, values = self._series[asset]
+        ns = _as_ns(date)
+        i = np.searchsorted(dates, ns)
+        if i == len(dates) or dates[i] != ns:
+            return None
+
+        row = {"date": pd.Timestamp(ns), "asset": asset}
+        for c in self.value_columns:
+            row[c] = float(values[c][i])
+        return row
+
+    def latest_rows(self):
+        """
+        Last row of every asset as a frame
+        """
+        rows = []
+        for asset, (dates, _) in list(self._series.items()):
+            if len(dates):
+                rows.append(self.row_at(asset, dates[-1]))
+
+        return pd.DataFrame(rows, columns=["date", "asset"] + self.value_columns)
+
+
+class LazyHistoryStore(SeriesStore):
+    """
+    SeriesStore filled on demand: each asset holds a suffix of its
+    history and is only extended backwards when an earlier start
+    date is requested. Downloads are serialised per asset, so
+    concurrent sessions asking for the same data fetch it once.
+    """
+
+    def __init__(self, fetch, value_columns=("price",)):
+        """
+        fetch(asset, start, before) -> DataFrame (date, *value_columns)
+        with start <= date < before (None = unbounded)
+        """
+        super().__init__(value_columns)
+        self._fetch = fetch
+        self._loaded_from = {}
+        self._locks = {}
+        self._locks_guard = threading.Lock()
+
+    def _lock(self, asset):
+        with self._locks_guard:
+            return self._locks.setdefault(asset, threading.Lock())
+
+    def ensure(self, asset, start=None):
+        """
+        Make sure the asset is loaded from `start` (None = full history)
+        """
+        with self._lock(asset):
+            if asset not in self._loaded_from:
+                self.set_series(asset, self._fetch(asset, start, None))
+                self._loaded_from[asset] = start
+                return
+
+            loaded_from = self._loaded_from[asset]
+
+            # Already complete, or already covers the requested start
+            if loaded_from is None or (
+                start is not None and pd.Timestamp(start) >= pd.Timestamp(loaded_from)
+            ):
+                return
+
+            older = self._fetch(asset, start, loaded_from)
+            current = self.slice(asset)[["date"] + self.value_columns]
+            self.set_series(asset, pd.concat([older, current], ignore_index=True))
+            self._loaded_from[asset] = start
@@ -0,0 +1,98 @@
+import hashlib
+
+from config.settings import ASSET_CONFIG, DISCOVERED_ASSET_DEFAULTS, HISTORICAL_FILE
+from data.history_loader import asset_name_for, available_columns
+
+
+def _discovered(historical_column=None):
+    return {
+        "historical_column": historical_column,
+        "live_symbol": None,
+        # Not in ASSET_CONFIG: skipped (not failed) without history
+        "discovered": True,
+        **DISCOVERED_ASSET_DEFAULTS,
+    }
+
+
+def _price_history_assets():
+    """
+    Asset names present in Supabase price_history.
+
+    Reads the price_history_assets view (created by
+    supabase/migrations/20261018120000_forecast_schema.sql), so
+    discovery costs one small request instead of a full scan.
+    """
+    from data.cloud_history_loader import supabase
+
+    response = supabase.table("price_history_assets").select("asset").execute()
+    return [row["asset"] for row in response.data or []]
+
+
+def discover_assets(historical_file=HISTORICAL_FILE, cloud=True):
+    """
+    ASSET_CONFIG plus every commodity column of the historical file and
+    (cloud=True) every asset in price_history that is not configured.
+
+    Discovered assets have no live symbol (the pipeline falls back to
+    the last known price) and use DISCOVERED_ASSET_DEFAULTS.
+    Returns dict asset -> config, configured assets first.
+    """
+    assets = {name: dict(info) for name, info in ASSET_CONFIG.items()}
+    configured_columns = {info.get("historical_column") for info in assets.values()}
+
+    try:
+        columns = available_columns(historical_file)
+    except FileNotFoundError:
+        columns = []
+
+    for column in columns:
+        name = asset_name_for(column)
+        if column not in configured_columns and name not in assets:
+            assets[name] = _discovered(column)
+
+    if cloud:
+        try:
+            names = _price_history_assets()
+        except Exception as exc:
+            print(f"[WARN] Could not list price_history assets: {exc}")
+            names = []
+
+        for name in sorted(names):
+            assets.setdefault(name, _discovered())
+
+    return assets
+
+
+def shard_of(asset, n_shards):
+    """
+    Stable shard index of an asset (same on every machine and run,
+    unlike hash())
+    """
+    digest = hashlib.sha1(asset.encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big") % n_shards
+
+
+def parse_shard(text):
+    """
+    "i/N" -> (i, N) with 0 <= i < N
+    """
+    try:
+        index, total = (int(part) for part in text.split("/"))
+    except ValueError:
+        raise ValueError(f"Shard must look like i/N, got {text!r}")
+
+    if total < 1 or not 0 <= index < total:
+        raise ValueError(f"Shard index must be in [0, {total}), got {text!r}")
+
+    return index, total
+
+
+def select_shard(assets, index, total):
+    """
+    The assets (in their original order) that belong to shard index/total
+    """
+    return {
+        name: info
+        for name, info in assets.items()
+        if shard_of(name, total) == index
+    }
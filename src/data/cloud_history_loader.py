@@ -1,40 +1,212 @@
+import hashlib
+import json
 import os
+from datetime import datetime, timezone
+
 import pandas as pd
-from supabase import create_client
-from dotenv import load_dotenv
 
-load_dotenv()
+from config.settings import (
+    HISTORY_CACHE_DIR,
+    HISTORY_CACHE_ENABLED,
+    HISTORY_FULL_RESYNC_DAYS,
+    HISTORY_PAGE_CONCURRENCY,
+    HISTORY_PAGE_SIZE,
+)
+from data.series import PriceSeries
+from utils.instrumentation import timed
+from utils.pagination import fetch_all
+from utils.supabase_client import create_supabase_client
+
+supabase = create_supabase_client()
 
-SUPABASE_URL = os.getenv("SUPABASE_URL")
-SUPABASE_KEY = os.getenv("SUPABASE_SERVICE_KEY")
 
-if not SUPABASE_URL or not SUPABASE_KEY:
-    raise ValueError("Supabase credentials not found")
+def _history_query(assets, after=None, count=None):
+    query = (
+        supabase
+        .table("price_history")
+        .select("asset, date, price", count=count)
+        .in_("asset", list(assets))
+    )
 
-supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
+    if after is not None:
+        query = query.gt("date", after)
 
+    # Stable total order so range() pages never overlap or skip rows
+    return query.order("asset").order("date")
 
-def load_cloud_history(asset):
-    """
-    Load full historical time series for a single asset
-    from Supabase price_history table.
 
-    Returns DataFrame with columns: date, price
+@timed("supabase.price_history")
+def _fetch_histories(assets, after=None):
     """
+    Query price_history for several assets in one paginated query,
+    optionally only rows with date > after (pages fetched concurrently).
 
-    response = (
-        supabase
-        .table("price_history")
-        .select("date, price")
-        .eq("asset", asset)
-        .order("date")
-        .execute()
+    Returns DataFrame with columns: asset, date, price (possibly empty)
+    """
+    rows = fetch_all(
+        lambda count: _history_query(assets, after, count=count),
+        page_size=HISTORY_PAGE_SIZE,
+        concurrency=HISTORY_PAGE_CONCURRENCY
     )
 
-    if not response.data:
-        raise ValueError(f"No history found for asset: {asset}")
-
-    df = pd.DataFrame(response.data)
+    df = pd.DataFrame(rows, columns=["asset", "date", "price"])
     df["date"] = pd.to_datetime(df["date"])
 
     return df
+
+
+# ================== LOCAL CACHE ==================
+# One Parquet file per asset + a small JSON sidecar holding the
+# watermark (latest cached date), row count and file checksum.
+
+def _cache_paths(asset):
+    base = os.path.join(HISTORY_CACHE_DIR, asset)
+    return base + ".parquet", base + ".meta.json"
+
+
+def _file_sha256(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _read_cache(asset):
+    """
+    Return (df, meta) from the local cache, or (None, None) when missing,
+    corrupted or due for a periodic full resync
+    """
+    data_path, meta_path = _cache_paths(asset)
+
+    if not (os.path.exists(data_path) and os.path.exists(meta_path)):
+        return None, None
+
+    try:
+        with open(meta_path) as f:
+            meta = json.load(f)
+
+        if _file_sha256(data_path) != meta["sha256"]:
+            print(f"[WARN] History cache checksum mismatch for {asset}")
+            return None, None
+
+        synced = datetime.fromisoformat(meta["full_sync_at"])
+        age_days = (datetime.now(timezone.utc) - synced).days
+        if age_days >= HISTORY_FULL_RESYNC_DAYS:
+            print(f"[INFO] History cache for {asset} is {age_days} days old, resyncing")
+            return None, None
+
+        df = pd.read_parquet(data_path)
+
+    except (OSError, ValueError, KeyError) as exc:
+        print(f"[WARN] Unreadable history cache for {asset}: {exc}")
+        return None, None
+
+    if len(df) != meta["rows"]:
+        print(f"[WARN] History cache row count mismatch for {asset}")
+        return None, None
+
+    return df, meta
+
+
+def _write_cache(asset, series, full_sync_at):
+    os.makedirs(HISTORY_CACHE_DIR, exist_ok=True)
+    data_path, meta_path = _cache_paths(asset)
+
+    tmp_path = data_path + ".tmp"
+    series.to_frame().to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, data_path)
+
+    meta = {
+        "watermark": series.last_date.strftime("%Y-%m-%d"),
+        "rows": int(len(series)),
+        "sha256": _file_sha256(data_path),
+        "full_sync_at": full_sync_at,
+    }
+
+    tmp_path = meta_path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(meta, f)
+    os.replace(tmp_path, meta_path)
+
+
+def load_cloud_histories(assets, full_resync=False):
+    """
+    Load historical time series for several assets from the
+    Supabase price_history table in a constant number of queries
+    (one for uncached assets, one for incremental updates).
+
+    Returns dict asset -> PriceSeries (sorted by date).
+    Assets without any history are left out.
+    """
+    cached = {}
+    if HISTORY_CACHE_ENABLED and not full_resync:
+        for asset in assets:
+            df, meta = _read_cache(asset)
+            if df is not None:
+                cached[asset] = (df, meta)
+
+    uncached = [a for a in assets if a not in cached]
+    now = datetime.now(timezone.utc).isoformat()
+    histories = {}
+
+    # 1. Full download for assets without a usable cache
+    if uncached:
+        full_df = _fetch_histories(uncached)
+
+        for asset, group in full_df.groupby("asset", sort=False):
+            series = PriceSeries.from_frame(group)
+            histories[asset] = (series, len(group), now)
+
+    # 2. Only rows newer than the oldest watermark for cached assets
+    if cached:
+        oldest = min(meta["watermark"] for _, meta in cached.values())
+        new_df = _fetch_histories(list(cached), after=oldest)
+        new_groups = dict(tuple(new_df.groupby("asset", sort=False)))
+
+        for asset, (df, meta) in cached.items():
+            series = PriceSeries.from_frame(df)
+            group = new_groups.get(asset)
+            new_rows = 0
+
+            if group is not None:
+                # Rows between the oldest and this asset's watermark
+                # were already cached
+                group = group[group["date"] > pd.Timestamp(meta["watermark"])]
+                new_rows = len(group)
+
+            if new_rows:
+                series.extend(group["date"].to_numpy(), group["price"].to_numpy())
+
+            histories[asset] = (series, new_rows, meta["full_sync_at"])
+
+    result = {}
+
+    for asset in assets:
+        if asset not in histories:
+            continue
+
+        series, new_rows, full_sync_at = histories[asset]
+
+        if HISTORY_CACHE_ENABLED and (asset in uncached or new_rows):
+            _write_cache(asset, series, full_sync_at)
+
+        print(f"Loaded {len(series)} history rows for {asset} ({new_rows} downloaded)")
+        result[asset] = series
+
+    return result
+
+
+def load_cloud_history(asset, full_resync=False):
+    """
+    Load full historical time series for a single asset
+    from Supabase price_history table.
+
+    Returns PriceSeries
+    """
+    histories = load_cloud_histories([asset], full_resync=full_resync)
+
+    if asset not in histories:
+        raise ValueError(f"No history found for asset: {asset}")
+
+    return histories[asset]
@@ -1,13 +1,84 @@
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
 import requests
 import pandas as pd
+from requests.adapters import HTTPAdapter
 from dotenv import load_dotenv
 
+from config.settings import (
+    FETCH_BACKOFF_BASE,
+    FETCH_CONCURRENCY,
+    FETCH_MAX_RETRIES,
+    FETCH_TIMEOUT,
+)
+from utils.instrumentation import timed
+from utils.retry import retry_call
+
 load_dotenv()
 
 API_KEY = os.getenv("API_NINJAS_KEY")
 BASE_URL = "https://api.api-ninjas.com/v1/commodityprice"
 
+# Shared keep-alive session (created lazily, one per process)
+_session = None
+_session_lock = threading.Lock()
+
+
+class TransientFetchError(Exception):
+    """
+    Rate limit (429) or server error (5xx) worth retrying
+    """
+
+    def __init__(self, response):
+        super().__init__(f"HTTP {response.status_code}")
+        self.response = response
+        self.retry_after = _parse_retry_after(response)
+
+
+def _parse_retry_after(response):
+    try:
+        return float(response.headers.get("Retry-After", ""))
+    except ValueError:
+        return None
+
+
+def _get_session():
+    global _session
+
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            session.headers.update({"X-Api-Key": API_KEY})
+
+            adapter = HTTPAdapter(
+                pool_connections=1,
+                pool_maxsize=FETCH_CONCURRENCY
+            )
+            session.mount("https://", adapter)
+
+            _session = session
+
+    return _session
+
+
+@timed("http.api_ninjas")
+def _get_price(live_symbol):
+    """
+    One GET with timeout; raises TransientFetchError on 429/5xx
+    """
+    response = _get_session().get(
+        BASE_URL,
+        params={"name": live_symbol},
+        timeout=FETCH_TIMEOUT
+    )
+
+    if response.status_code == 429 or response.status_code >= 500:
+        raise TransientFetchError(response)
+
+    return response
+
 
 def fetch_daily_prices(live_symbol):
     """
@@ -19,17 +90,25 @@ def fetch_daily_prices(live_symbol):
         None (if API fails / asset not available)
     """
 
-    headers = {
-        "X-Api-Key": API_KEY
-    }
-
-    params = {
-        "name": live_symbol
-    }
-
     print(f"Fetching live price for {live_symbol}...")
 
-    response = requests.get(BASE_URL, headers=headers, params=params)
+    try:
+        response = retry_call(
+            lambda: _get_price(live_symbol),
+            attempts=FETCH_MAX_RETRIES + 1,
+            base_delay=FETCH_BACKOFF_BASE,
+            retry_on=(
+                TransientFetchError,
+                requests.ConnectionError,
+                requests.Timeout,
+            ),
+            label=f"Live price fetch for {live_symbol}"
+        )
+    except TransientFetchError as exc:
+        response = exc.response
+    except requests.RequestException as exc:
+        print(f"[WARN] Live price fetch failed for {live_symbol}: {exc}")
+        return None
 
     # ---- HARD SAFETY (DO NOT BREAK PIPELINE) ----
     if response.status_code != 200:
@@ -38,12 +117,34 @@ def fetch_daily_prices(live_symbol):
         print("Response Text:", response.text)
         return None   #  CRITICAL: do NOT raise exception
 
-    data = response.json()
+    try:
+        data = response.json()
 
-    # API-Ninjas returns `updated` as UNIX timestamp
-    df = pd.DataFrame([{
-        "date": pd.to_datetime(data["updated"], unit="s"),
-        "price": float(data["price"])
-    }])
+        # API-Ninjas returns `updated` as UNIX timestamp
+        df = pd.DataFrame([{
+            "date": pd.to_datetime(data["updated"], unit="s"),
+            "price": float(data["price"])
+        }])
+    except (ValueError, KeyError, TypeError) as exc:
+        print(f"[WARN] Unexpected live price payload for {live_symbol}: {exc}")
+        return None
 
     return df
+
+
+def fetch_daily_prices_batch(live_symbols):
+    """
+    Fetch latest prices for several symbols concurrently over
+    one pooled session.
+
+    Returns dict live_symbol -> DataFrame (date, price) or None
+    """
+    symbols = list(dict.fromkeys(live_symbols))
+
+    if not symbols:
+        return {}
+
+    with ThreadPoolExecutor(max_workers=min(FETCH_CONCURRENCY, len(symbols))) as pool:
+        results = list(pool.map(fetch_daily_prices, symbols))
+
+    return dict(zip(symbols, results))
@@ -1,43 +1,146 @@
+import os
+
 import pandas as pd
+import pyarrow.parquet as pq
 
+from data.series import PriceSeries
+
+# Columns already read in this process, keyed by
+# (columnar file, file mtime, column). Loading several assets from the
+# same file reads each column once; a rebuilt file is read afresh.
+_column_cache = {}
 
-def load_historical_data(asset_name, asset_config, filepath="data/commodity_futures.csv"):
-    """
-    Load historical prices for a specific asset.
-    Returns DataFrame with columns: date, price
-    """
-    df = pd.read_csv(filepath)
 
+def _detect_date_column(columns):
     # --- Detect date column safely ---
     possible_date_cols = ["date", "Date", "DATE"]
 
-    date_col = None
     for col in possible_date_cols:
-        if col in df.columns:
-            date_col = col
-            break
+        if col in columns:
+            return col
+
+    raise ValueError("No date column found in historical CSV")
 
-    if date_col is None:
-        raise ValueError("No date column found in historical CSV")
 
+def columnar_path(csv_path):
+    """
+    Parquet file that mirrors a historical CSV (same name, .parquet)
+    """
+    return os.path.splitext(csv_path)[0] + ".parquet"
+
+
+def convert_to_columnar(csv_path):
+    """
+    One-time conversion of a historical CSV into Parquet.
+
+    The date column is parsed and stored as `date`, rows are sorted by
+    date, and every other column is kept as-is, so later reads can load
+    only the columns they need (memory-mapped, no text parsing).
+
+    Returns path of the Parquet file.
+    """
+    df = pd.read_csv(csv_path)
+
+    date_col = _detect_date_column(df.columns)
     df[date_col] = pd.to_datetime(df[date_col])
+    df = df.rename(columns={date_col: "date"})
+    df = df.sort_values("date").reset_index(drop=True)
+
+    path = columnar_path(csv_path)
+    tmp_path = path + ".tmp"
+    df.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, path)
+
+    return path
+
+
+def _ensure_columnar(csv_path):
+    """
+    Parquet mirror of csv_path, (re)built if missing or older than the CSV
+    """
+    path = columnar_path(csv_path)
+
+    if not os.path.exists(path) or (
+        os.path.exists(csv_path)
+        and os.path.getmtime(path) < os.path.getmtime(csv_path)
+    ):
+        print(f"Converting {csv_path} to {path}")
+        convert_to_columnar(csv_path)
+
+    return path
+
 
+def asset_name_for(column):
+    """
+    Asset key for a commodity column ("NATURAL GAS" -> "NATURAL_GAS")
+    """
+    return column.strip().upper().replace(" ", "_")
+
+
+def available_columns(filepath):
+    """
+    Commodity columns in a historical file (everything except date)
+    """
+    path = _ensure_columnar(filepath)
+    return [c for c in pq.read_schema(path).names if c != "date"]
+
+
+def read_columns(filepath, columns):
+    """
+    Read `date` plus the requested columns from a historical file.
+
+    Only columns not yet read in this process are loaded from the
+    Parquet mirror. Returns a new DataFrame (callers may modify it).
+    """
+    path = _ensure_columnar(filepath)
+    wanted = ["date"] + [c for c in columns if c != "date"]
+    version = os.stat(path).st_mtime_ns
+
+    missing = [c for c in wanted if (path, version, c) not in _column_cache]
+
+    if missing:
+        # Forget columns of an older version of this file
+        for key in [k for k in _column_cache if k[0] == path and k[1] != version]:
+            del _column_cache[key]
+
+        available = pq.read_schema(path).names
+        unknown = [c for c in missing if c not in available]
+        if unknown:
+            raise ValueError(f"Column '{unknown[0]}' not found in historical data")
+
+        loaded = pd.read_parquet(path, columns=missing, memory_map=True)
+        for c in missing:
+            _column_cache[(path, version, c)] = loaded[c]
+
+    return pd.DataFrame({c: _column_cache[(path, version, c)] for c in wanted})
+
+
+def load_historical_data(asset_name, asset_config, filepath="data/commodity_futures.csv"):
+    """
+    Load historical prices for a specific asset.
+    Returns PriceSeries (sorted by date)
+    """
     # --- Get correct commodity column ---
     column_name = asset_config["historical_column"]
 
-    if column_name not in df.columns:
-        raise ValueError(f"Column '{column_name}' not found in historical data")
+    asset_df = read_columns(filepath, [column_name])
 
-    asset_df = df[[date_col, column_name]].copy()
-    asset_df.rename(
-        columns={
-            date_col: "date",
-            column_name: "price"
-        },
-        inplace=True
+    # Sorts only if the file is out of order
+    return PriceSeries.from_arrays(
+        asset_df["date"].to_numpy(),
+        asset_df[column_name].to_numpy()
     )
 
-    # Safety: ensure correct time order
-    asset_df = asset_df.sort_values("date").reset_index(drop=True)
 
-    return asset_df
+def load_historical_assets(asset_configs, filepath="data/commodity_futures.csv"):
+    """
+    Load historical prices for several assets with one columnar read.
+    Returns dict asset -> PriceSeries
+    """
+    columns = [info["historical_column"] for info in asset_configs.values()]
+    read_columns(filepath, columns)
+
+    return {
+        asset: load_historical_data(asset, info, filepath)
+        for asset, info in asset_configs.items()
+    }
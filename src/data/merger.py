@@ -1,25 +1,19 @@
-import pandas as pd
+from data.series import as_series
 
 
-def merge_historical_and_live(historical_df, live_df):
+def merge_historical_and_live(historical, live):
     """
     Append live price to historical data if date is new.
-    Returns combined DataFrame with columns: date, price
-    """
-    # Ensure correct types
-    historical_df["date"] = pd.to_datetime(historical_df["date"])
-    live_df["date"] = pd.to_datetime(live_df["date"])
 
-    # If live date already exists, do NOT duplicate
-    if live_df["date"].iloc[0] in historical_df["date"].values:
-        combined_df = historical_df.copy()
-    else:
-        combined_df = pd.concat(
-            [historical_df, live_df],
-            ignore_index=True
-        )
+    historical: PriceSeries (extended in place) or a (date, price)
+    DataFrame (left untouched); live: PriceSeries or DataFrame.
+    Returns the combined PriceSeries.
+    """
+    series = as_series(historical)
+    live = as_series(live)
 
-    # Sort by date (important for time series)
-    combined_df = combined_df.sort_values("date").reset_index(drop=True)
+    # If live date already exists, do NOT duplicate (the history wins)
+    for date, price in zip(live.dates, live.prices):
+        series.append(date, price, replace=False)
 
-    return combined_df
+    return series
@@ -0,0 +1,224 @@
+import numpy as np
+import pandas as pd
+
+# Spare slots allocated after the last observation, so the daily live
+# price (and a few more) can be appended without reallocating
+APPEND_HEADROOM = 8
+
+
+class PriceSeries:
+    """
+    One asset's (date, price) history: a datetime64[ns] array and a
+    float64 array, always sorted by date with unique dates.
+
+    New observations go in by binary search: a later date is appended
+    in place (amortized O(1)), an existing date has its price replaced,
+    anything else is inserted. to_frame() / to_prophet_frame() wrap the
+    arrays in a DataFrame without copying them.
+    """
+
+    __slots__ = ("_dates", "_prices", "_size")
+
+    def __init__(self, dates=None, prices=None, capacity=None):
+        """
+        dates / prices must already be sorted with unique dates;
+        use from_arrays() / from_frame() for arbitrary input
+        """
+        dates = np.asarray([] if dates is None else dates, dtype="datetime64[ns]")
+        prices = np.asarray([] if prices is None else prices, dtype="float64")
+
+        if len(dates) != len(prices):
+            raise ValueError("dates and prices must have the same length")
+
+        size = len(dates)
+        capacity = max(capacity or 0, size + APPEND_HEADROOM)
+
+        self._dates = np.empty(capacity, dtype="datetime64[ns]")
+        self._prices = np.empty(capacity, dtype="float64")
+        self._dates[:size] = dates
+        self._prices[:size] = prices
+        self._size = size
+
+    # ---- construction ----
+    @classmethod
+    def from_arrays(cls, dates, prices):
+        """
+        Series from unsorted arrays; for a repeated date the last
+        price wins. Sorts only when the input is out of order.
+        """
+        dates = np.asarray(pd.to_datetime(dates), dtype="datetime64[ns]")
+        prices = np.asarray(prices, dtype="float64")
+
+        if len(dates) > 1 and not (dates[1:] > dates[:-1]).all():
+            order = np.argsort(dates, kind="stable")
+            dates, prices = dates[order], prices[order]
+
+            # Keep the last of each run of equal dates
+            last = np.append(dates[1:] != dates[:-1], True)
+            dates, prices = dates[last], prices[last]
+
+        return cls(dates, prices)
+
+    @classmethod
+    def from_frame(cls, df, date_column="date", price_column="price"):
+        """
+        Series from a (date, price) DataFrame; the frame is not modified
+        """
+        return cls.from_arrays(df[date_column].to_numpy(), df[price_column].to_numpy())
+
+    # ---- access ----
+    def __len__(self):
+        return self._size
+
+    def __repr__(self):
+        if not self._size:
+            return "PriceSeries(empty)"
+        return f"PriceSeries({self._size} rows, {self.first_date.date()} .. {self.last_date.date()})"
+
+    @property
+    def dates(self):
+        """
+        Read-only datetime64[ns] view of the dates
+        """
+        view = self._dates[:self._size]
+        view.flags.writeable = False
+        return view
+
+    @property
+    def prices(self):
+        """
+        Read-only float64 view of the prices
+        """
+        view = self._prices[:self._size]
+        view.flags.writeable = False
+        return view
+
+    @property
+    def first_date(self):
+        return pd.Timestamp(self._dates[0]) if self._size else None
+
+    @property
+    def last_date(self):
+        return pd.Timestamp(self._dates[self._size - 1]) if self._size else None
+
+    @property
+    def last_price(self):
+        return float(self._prices[self._size - 1]) if self._size else None
+
+    def __contains__(self, date):
+        date = np.datetime64(pd.Timestamp(date), "ns")
+        i = np.searchsorted(self._dates[:self._size], date)
+        return i < self._size and self._dates[i] == date
+
+    # ---- updates ----
+    def _grow(self, needed):
+        capacity = max(needed, 2 * len(self._dates))
+        for name in ("_dates", "_prices"):
+            old = getattr(self, name)
+            new = np.empty(capacity, dtype=old.dtype)
+            new[:self._size] = old[:self._size]
+            setattr(self, name, new)
+
+    def append(self, date, price, replace=True):
+        """
+        Add one observation. An existing date has its price replaced
+        (or kept, with replace=False). Returns self.
+        """
+        date = np.datetime64(pd.Timestamp(date), "ns")
+        n = self._size
+
+        if n and date <= self._dates[n - 1]:
+            i = int(np.searchsorted(self._dates[:n], date))
+            if self._dates[i] == date:
+                if replace:
+                    self._prices[i] = price
+                return self
+        else:
+            i = n
+
+        if n == len(self._dates):
+            self._grow(n + 1)
+
+        if i < n:
+            # Out-of-order date: shift the tail one slot right
+            self._dates[i + 1:n + 1] = self._dates[i:n]
+            self._prices[i + 1:n + 1] = self._prices[i:n]
+
+        self._dates[i] = date
+        self._prices[i] = price
+        self._size = n + 1
+
+        return self
+
+    def extend(self, dates, prices, replace=True):
+        """
+        Add many observations (any order). Newer-than-last rows are
+        appended in bulk; overlapping dates follow `replace`.
+        Returns self.
+        """
+        other = PriceSeries.from_arrays(dates, prices)
+        if not len(other):
+            return self
+
+        n = self._size
+
+        if not n or other._dates[0] > self._dates[n - 1]:
+            m = len(other)
+            if n + m > len(self._dates):
+                self._grow(n + m + APPEND_HEADROOM)
+            self._dates[n:n + m] = other.dates
+            self._prices[n:n + m] = other.prices
+            self._size = n + m
+            return self
+
+        # Overlapping dates: merge the two sorted arrays once
+        if replace:
+            first, second = self, other
+        else:
+            first, second = other, self
+
+        merged = PriceSeries.from_arrays(
+            np.concatenate([first.dates, second.dates]),
+            np.concatenate([first.prices, second.prices])
+        )
+        self._dates, self._prices, self._size = merged._dates, merged._prices, merged._size
+
+        return self
+
+    # ---- derived series / frames ----
+    def dropna(self):
+        """
+        Series without NaN prices (self when there are none)
+        """
+        valid = ~np.isnan(self.prices)
+        if valid.all():
+            return self
+        return PriceSeries(self.dates[valid], self.prices[valid])
+
+    def tail(self, n):
+        return PriceSeries(self.dates[-n:] if n else [], self.prices[-n:] if n else [])
+
+    def to_frame(self, date_column="date", price_column="price"):
+        """
+        DataFrame over the series' arrays (no copy); treat it as a
+        snapshot, later appends are not reflected in it
+        """
+        return pd.DataFrame(
+            {date_column: self.dates, price_column: self.prices},
+            copy=False
+        )
+
+    def to_prophet_frame(self):
+        """
+        Prophet input (ds, y) over the series' arrays (no copy)
+        """
+        return self.to_frame("ds", "y")
+
+
+def as_series(data):
+    """
+    PriceSeries for a PriceSeries (as-is) or a (date, price) DataFrame
+    """
+    if isinstance(data, PriceSeries):
+        return data
+    return PriceSeries.from_frame(data)
@@ -0,0 +1,185 @@
+import math
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+
+from evaluation.metrics import calculate_error
+from model.forecaster import (
+    BATCH_ENGINES,
+    SERIES_ENGINES,
+    fit_prophet,
+    forecast_batch,
+    predict_next,
+    to_prophet_frame,
+)
+from model.training_policy import resolve_policy
+from model.warm_start import warm_start_params
+
+RESULT_COLUMNS = [
+    "asset",
+    "engine",
+    "cutoff",
+    "target_date",
+    "predicted_price",
+    "actual_price",
+    "error",
+    "fit_seconds",
+]
+
+
+def make_cutoffs(df, n_cutoffs):
+    """
+    The last n_cutoffs observation dates that still have a next
+    observation to score against (oldest first)
+    """
+    dates = df["date"].to_numpy()
+    return list(pd.to_datetime(dates[-n_cutoffs - 1:-1]))
+
+
+def _result_row(asset, engine, df, cutoff_pos, prediction, fit_seconds):
+    actual = float(df["price"].iloc[cutoff_pos + 1])
+
+    return {
+        "asset": asset,
+        "engine": engine,
+        "cutoff": df["date"].iloc[cutoff_pos],
+        "target_date": df["date"].iloc[cutoff_pos + 1],
+        "predicted_price": float(prediction),
+        "actual_price": actual,
+        "error": calculate_error(actual, prediction),
+        "fit_seconds": fit_seconds,
+    }
+
+
+def backtest_series_chunk(asset, engine, df, cutoffs, use_cache=False, policy=None):
+    """
+    Walk-forward replay of a per-series engine over consecutive cutoffs
+    of one asset: train on date <= cutoff, predict the next observation.
+
+    For Prophet each fit uses the given training policy, is warm-started
+    from the previous cutoff's parameters, and (use_cache=True) cached
+    model artifacts are reused when they exist. The cache is off by
+    default: one artifact per cutoff would evict the daily run's models.
+
+    Runs inside a worker process; returns list of result rows.
+    """
+    positions = df["date"].searchsorted(pd.DatetimeIndex(cutoffs))
+    rows = []
+    init = None
+
+    for pos in positions:
+        train_df = df.iloc[:pos + 1]
+        started = time.perf_counter()
+
+        if engine == "prophet":
+            model = fit_prophet(
+                to_prophet_frame(train_df),
+                init=init,
+                use_cache=use_cache,
+                policy=policy
+            )
+            init = warm_start_params(model)
+            prediction = predict_next(model)
+        else:
+            prediction = SERIES_ENGINES[engine](train_df)["yhat"].iloc[0]
+
+        rows.append(_result_row(
+            asset, engine, df, pos, prediction, time.perf_counter() - started
+        ))
+
+    return rows
+
+
+def backtest_batch_engine(engine, frames, n_cutoffs):
+    """
+    Walk-forward replay of a batch engine: at each cutoff step every
+    asset is forecast in one vectorized call.
+
+    Cutoffs are aligned per asset by position (k-th last observation),
+    matching how batch engines treat series as step-indexed.
+    """
+    rows = []
+
+    for k in range(n_cutoffs, 0, -1):
+        # Train on everything up to the (k+1)-th last observation
+        train = {
+            asset: df.iloc[:len(df) - k]
+            for asset, df in frames.items()
+            if len(df) > k
+        }
+
+        if not train:
+            continue
+
+        started = time.perf_counter()
+        predictions = forecast_batch(train, engine)
+        elapsed = (time.perf_counter() - started) / len(train)
+
+        for asset, prediction in predictions.items():
+            df = frames[asset]
+            rows.append(_result_row(
+                asset, engine, df, len(df) - k - 1, prediction, elapsed
+            ))
+
+    return rows
+
+
+def _split(items, n_chunks):
+    size = math.ceil(len(items) / max(1, n_chunks))
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def run_backtest(frames, engines, n_cutoffs, workers=1, use_cache=False, policies=None):
+    """
+    Rolling-origin backtest over the last n_cutoffs observations of
+    every asset.
+
+    frames:   dict asset -> cleaned DataFrame (date, price)
+    engines:  dict asset -> engine name
+    policies: dict asset -> Prophet training policy (default: DEFAULT_TRAINING_POLICY)
+    Per-series engines are split into chunks of consecutive cutoffs
+    and run in a process pool; batch engines run in this process.
+
+    Returns DataFrame with one row per (asset, cutoff): RESULT_COLUMNS
+    """
+    rows = []
+
+    # Batch engines: all their assets per cutoff in one call
+    by_engine = {}
+    for asset, engine in engines.items():
+        by_engine.setdefault(engine, []).append(asset)
+
+    for engine, assets in by_engine.items():
+        if engine in BATCH_ENGINES:
+            rows.extend(backtest_batch_engine(
+                engine, {a: frames[a] for a in assets}, n_cutoffs
+            ))
+
+    # Per-series engines: enough chunks per asset to keep every worker
+    # busy, each chunk replayed in order so warm starts chain
+    series_assets = [a for a, e in engines.items() if e not in BATCH_ENGINES]
+    chunks_per_asset = max(1, math.ceil(2 * workers / max(1, len(series_assets))))
+
+    tasks = []
+    for asset in series_assets:
+        cutoffs = make_cutoffs(frames[asset], n_cutoffs)
+        for chunk in _split(cutoffs, chunks_per_asset):
+            tasks.append((
+                asset, engines[asset], frames[asset], chunk, use_cache,
+                resolve_policy((policies or {}).get(asset))
+            ))
+
+    if workers == 1:
+        for task in tasks:
+            rows.extend(backtest_series_chunk(*task))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(backtest_series_chunk, *task) for task in tasks]
+
+            for future in as_completed(futures):
+                rows.extend(future.result())
+
+    results = pd.DataFrame(rows, columns=RESULT_COLUMNS)
+
+    return results.sort_values(["asset", "cutoff"]).reset_index(drop=True)
@@ -1,5 +1,248 @@
+import numpy as np
+import pandas as pd
+
+# Number of most recent results kept for the rolling KPIs
+ROLLING_WINDOW = 30
+
+
 def calculate_error(actual: float, predicted: float) -> float:
     """
     Calculate absolute prediction error
     """
     return abs(actual - predicted)
+
+
+# ================== ARRAY METRICS ==================
+# All take equally long array-likes and ignore NaN pairs.
+
+def _pair(actual, predicted):
+    a = np.asarray(actual, dtype="float64")
+    p = np.asarray(predicted, dtype="float64")
+    keep = ~(np.isnan(a) | np.isnan(p))
+    return a[keep], p[keep]
+
+
+def mae(actual, predicted):
+    a, p = _pair(actual, predicted)
+    return float(np.mean(np.abs(a - p))) if len(a) else np.nan
+
+
+def rmse(actual, predicted):
+    a, p = _pair(actual, predicted)
+    return float(np.sqrt(np.mean((a - p) ** 2))) if len(a) else np.nan
+
+
+def mape(actual, predicted):
+    """
+    Mean absolute percentage error, in % (zero actuals skipped)
+    """
+    a, p = _pair(actual, predicted)
+    nz = a != 0
+    return float(np.mean(np.abs((a[nz] - p[nz]) / a[nz])) * 100) if nz.any() else np.nan
+
+
+def smape(actual, predicted):
+    """
+    Symmetric MAPE, in % (0-200)
+    """
+    a, p = _pair(actual, predicted)
+    denom = np.abs(a) + np.abs(p)
+    nz = denom != 0
+    return float(np.mean(2 * np.abs(a[nz] - p[nz]) / denom[nz]) * 100) if nz.any() else np.nan
+
+
+def bias(actual, predicted):
+    """
+    Mean signed error (predicted - actual); > 0 = over-forecasting
+    """
+    a, p = _pair(actual, predicted)
+    return float(np.mean(p - a)) if len(a) else np.nan
+
+
+def directional_accuracy(actual, predicted, previous_actual):
+    """
+    Share (%) of forecasts that called the direction of the move from
+    previous_actual correctly
+    """
+    a = np.asarray(actual, dtype="float64")
+    p = np.asarray(predicted, dtype="float64")
+    prev = np.asarray(previous_actual, dtype="float64")
+
+    keep = ~(np.isnan(a) | np.isnan(p) | np.isnan(prev))
+    if not keep.any():
+        return np.nan
+
+    hits = np.sign(p[keep] - prev[keep]) == np.sign(a[keep] - prev[keep])
+    return float(np.mean(hits) * 100)
+
+
+def error_table(df, group="asset", window=None, date="date"):
+    """
+    All metrics per group from a results frame (date, asset,
+    predicted_price, actual_price) in one vectorized pass; `date`
+    names the column results are ordered by.
+
+    window=None → one row per group over the full history;
+    window=N    → rolling N-result metrics, one row per result.
+    """
+    df = df.sort_values([group, date]).reset_index(drop=True)
+
+    a = df["actual_price"].astype("float64")
+    p = df["predicted_price"].astype("float64")
+    prev = a.groupby(df[group]).shift(1)
+
+    parts = pd.DataFrame({
+        group: df[group].to_numpy(),
+        date: df[date].to_numpy(),
+        "abs_err": (a - p).abs(),
+        "sq_err": (a - p) ** 2,
+        "ape": ((a - p) / a.where(a != 0)).abs() * 100,
+        "sape": 2 * (a - p).abs() / (a.abs() + p.abs()).where(lambda d: d != 0) * 100,
+        "signed": p - a,
+        "hit": (np.sign(p - prev) == np.sign(a - prev)).where(prev.notna()) * 100,
+    })
+
+    value_cols = ["abs_err", "sq_err", "ape", "sape", "signed", "hit"]
+
+    if window is None:
+        agg = parts.groupby(group)[value_cols].mean()
+        agg["count"] = parts.groupby(group).size()
+    else:
+        agg = (
+            parts.groupby(group)[value_cols]
+            .rolling(window, min_periods=1)
+            .mean()
+            .reset_index(level=0)
+        )
+        agg[date] = parts[date]
+
+    agg["rmse"] = np.sqrt(agg.pop("sq_err"))
+
+    return agg.rename(columns={
+        "abs_err": "mae",
+        "ape": "mape",
+        "sape": "smape",
+        "signed": "bias",
+        "hit": "directional_accuracy",
+    })
+
+
+# ================== RUNNING AGGREGATES ==================
+# Per-asset sums updated one result at a time, so KPIs never need the
+# full history. The last result's inputs are kept so a same-day rerun
+# replaces its contribution instead of counting it twice.
+
+SUM_FIELDS = ["abs_err", "sq_err", "ape", "sape", "signed", "hit"]
+COUNT_FIELDS = ["n", "n_ape", "n_sape", "n_hit"]
+
+
+def empty_stats(asset):
+    stats = {"asset": asset, "last_date": None, "last_actual": None,
+             "last_predicted": None, "prev_actual": None,
+             "window_abs": [], "window_ape": []}
+    for f in SUM_FIELDS + COUNT_FIELDS:
+        stats[f] = 0.0
+    return stats
+
+
+def _contribution(actual, predicted, prev_actual):
+    err = actual - predicted
+    c = {"abs_err": abs(err), "sq_err": err * err, "signed": predicted - actual,
+         "n": 1, "ape": 0.0, "n_ape": 0, "sape": 0.0, "n_sape": 0,
+         "hit": 0.0, "n_hit": 0}
+
+    if actual != 0:
+        c["ape"], c["n_ape"] = abs(err / actual) * 100, 1
+
+    denom = abs(actual) + abs(predicted)
+    if denom != 0:
+        c["sape"], c["n_sape"] = 2 * abs(err) / denom * 100, 1
+
+    if prev_actual is not None:
+        same = np.sign(predicted - prev_actual) == np.sign(actual - prev_actual)
+        c["hit"], c["n_hit"] = 100.0 * bool(same), 1
+
+    return c
+
+
+def update_stats(stats, date, actual, predicted):
+    """
+    Add one result (date as ISO string) to an asset's running stats.
+    A second result for the same date replaces the first; results
+    older than the last one are already counted and are ignored.
+    Returns the updated stats dict (input is not modified).
+    """
+    if stats["last_date"] is not None and date < stats["last_date"]:
+        return stats
+
+    stats = dict(stats)
+    stats["window_abs"] = list(stats["window_abs"])
+    stats["window_ape"] = list(stats["window_ape"])
+    actual, predicted = float(actual), float(predicted)
+
+    if stats["last_date"] == date:
+        old = _contribution(stats["last_actual"], stats["last_predicted"], stats["prev_actual"])
+        for f in SUM_FIELDS + COUNT_FIELDS:
+            stats[f] -= old[f]
+        stats["window_abs"].pop()
+        stats["window_ape"].pop()
+    else:
+        stats["prev_actual"] = stats["last_actual"]
+
+    new = _contribution(actual, predicted, stats["prev_actual"])
+    for f in SUM_FIELDS + COUNT_FIELDS:
+        stats[f] += new[f]
+
+    stats["window_abs"] = (stats["window_abs"] + [new["abs_err"]])[-ROLLING_WINDOW:]
+    stats["window_ape"] = (stats["window_ape"] + [new["ape"] if new["n_ape"] else None])[-ROLLING_WINDOW:]
+
+    stats["last_date"] = date
+    stats["last_actual"] = actual
+    stats["last_predicted"] = predicted
+
+    return stats
+
+
+def stats_from_frame(df):
+    """
+    Running stats per asset rebuilt from a results frame (date, asset,
+    predicted_price, actual_price). Used to seed the aggregates from
+    existing history; returns dict asset -> stats.
+    """
+    df = df.sort_values(["asset", "date"])
+    dates = pd.to_datetime(df["date"]).dt.strftime("%Y-%m-%d")
+    states = {}
+
+    for asset, day, actual, predicted in zip(
+        df["asset"], dates, df["actual_price"], df["predicted_price"]
+    ):
+        stats = states.get(asset) or empty_stats(asset)
+        states[asset] = update_stats(stats, day, actual, predicted)
+
+    return states
+
+
+def _ratio(total, count):
+    return total / count if count else None
+
+
+def stats_kpis(stats):
+    """
+    KPI values from running stats (O(1))
+    """
+    window_ape = [v for v in stats["window_ape"] if v is not None]
+
+    return {
+        "asset": stats["asset"],
+        "last_date": stats["last_date"],
+        "count": int(stats["n"]),
+        "mae": _ratio(stats["abs_err"], stats["n"]),
+        # max() guards against tiny negative sums left by replacements
+        "rmse": max(stats["sq_err"] / stats["n"], 0.0) ** 0.5 if stats["n"] else None,
+        "mape": _ratio(stats["ape"], stats["n_ape"]),
+        "smape": _ratio(stats["sape"], stats["n_sape"]),
+        "bias": _ratio(stats["signed"], stats["n"]),
+        "directional_accuracy": _ratio(stats["hit"], stats["n_hit"]),
+        "rolling_mae": _ratio(sum(stats["window_abs"]), len(stats["window_abs"])),
+        "rolling_mape": _ratio(sum(window_ape), len(window_ape)),
+    }
@@ -1,72 +1,530 @@
+import argparse
+import os
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
 import pandas as pd
 
-from config.settings import ASSET_CONFIG
+from config.settings import (
+    ASSET_CONFIG,
+    ERROR_ALERT_MAPE,
+    MAX_WORKERS,
+    RESULTS_BACKEND,
+)
 
-from data.fetcher import fetch_daily_prices
-from data.cloud_history_loader import load_cloud_history
+from data.fetcher import fetch_daily_prices_batch
+from data.assets import discover_assets, parse_shard, select_shard
+from data.cloud_history_loader import load_cloud_histories
 from data.merger import merge_historical_and_live
+from data.series import PriceSeries
 
-from processing.cleaner import clean_time_series
-from model.forecaster import train_and_predict
+from processing.quality import clean_histories
+from model.forecaster import (
+    SERIES_ENGINES,
+    engine_for,
+    forecast_batch_frames,
+    is_batch_engine,
+)
 from evaluation.metrics import calculate_error
-from storage.cloud_store import save_result
+from model.training_policy import policy_for
+from utils import instrumentation
+from utils.instrumentation import stage
 
 
-def main():
-    print("Using cloud storage for results")
-    print("System setup started")
-    print("Assets to process:", list(ASSET_CONFIG.keys()))
+def merge_live(asset_name, history, live_df):
+    """
+    Append the live price to an asset's history (PriceSeries,
+    extended in place). Returns the merged PriceSeries.
+    """
+    # 2.a FALLBACK if API is blocked / premium-only
+    if live_df is None:
+        print(f"[INFO] Using fallback price for {asset_name}")
+
+        live_df = PriceSeries(
+            [history.last_date + pd.Timedelta(days=1)],
+            [history.last_price]
+        )
 
-    for asset_name, asset_info in ASSET_CONFIG.items():
-        print("\n==============================")
-        print(f"Processing asset: {asset_name}")
-        print("==============================")
+    # 3. Merge historical + live
+    return merge_historical_and_live(
+        history,
+        live_df
+    )
 
-        # 1. Load historical data from cloud (Supabase)
-        historical_df = load_cloud_history(asset_name)
 
-        # 2. Fetch live price
-        live_df = fetch_daily_prices(
-            live_symbol=asset_info["live_symbol"]
+def print_quality_report(quality):
+    """
+    One line per asset whose data needed more than calendar gap filling
+    """
+    issues = quality[
+        quality[["duplicates", "outliers", "dropped"]].sum(axis=1) > 0
+    ]
+
+    print(
+        f"Data quality: {int(quality['filled'].sum())} rows filled, "
+        f"{int(quality['outliers'].sum())} outliers masked, "
+        f"{int(quality['duplicates'].sum())} duplicates dropped"
+    )
+
+    for row in issues.itertuples(index=False):
+        print(
+            f"[QUALITY] {row.asset}: duplicates={row.duplicates} "
+            f"missing={row.missing} outliers={row.outliers} "
+            f"dropped={row.dropped}"
         )
 
-        # 2.a FALLBACK if API is blocked / premium-only
-        if live_df is None:
-            print(f"[INFO] Using fallback price for {asset_name}")
 
-            live_df = historical_df.tail(1)[["date", "price"]].copy()
-            live_df["date"] = (
-                pd.to_datetime(live_df["date"]) + pd.Timedelta(days=1)
+def prepare_assets(assets, histories, live_prices, started):
+    """
+    merge → clean for every asset at once: each history gets its live
+    price, then all of them go through the data-quality stage
+    (processing.quality) in one vectorized pass.
+
+    Returns (dict asset -> cleaned PriceSeries,
+             dict asset -> failed summary)
+    """
+    merged = {}
+    failed = {}
+
+    for asset_name, asset_info in assets.items():
+        try:
+            merged[asset_name] = merge_live(
+                asset_name,
+                histories[asset_name],
+                live_prices.get(asset_info.get("live_symbol"))
             )
+        except Exception as exc:
+            failed[asset_name] = failed_summary(asset_name, exc, started)
+
+    # 4. Clean data
+    with stage("quality", rows=sum(len(s) for s in merged.values())):
+        cleaned, quality = clean_histories(merged)
+
+    print_quality_report(quality)
 
-        # 3. Merge historical + live
-        combined_df = merge_historical_and_live(
-            historical_df,
-            live_df
+    for asset_name in [a for a, s in cleaned.items() if not len(s)]:
+        del cleaned[asset_name]
+        failed[asset_name] = failed_summary(
+            asset_name, ValueError(f"No valid prices for asset: {asset_name}"), started
         )
 
-        # 4. Clean data
-        clean_df = clean_time_series(combined_df)
+    return cleaned, failed
+
+
+def evaluate_asset(asset_name, series, forecast, started):
+    """
+    Evaluate the horizon-1 prediction of a forecast frame. Returns the
+    asset's run summary, carrying every horizon (stored later, in one
+    batch, by store_results).
+    """
+    # 6. Evaluate
+    prediction = forecast["yhat"].iloc[0]
+    actual_price = series.last_price
+    error = calculate_error(actual_price, prediction)
+
+    return {
+        "asset": asset_name,
+        "status": "ok",
+        "predicted_price": float(prediction),
+        "actual_price": float(actual_price),
+        "error": float(error),
+        "forecast": forecast,
+        "seconds": time.perf_counter() - started,
+    }
 
+
+def failed_summary(asset_name, exc, started):
+    print(f"[ERROR] {asset_name} failed: {exc}")
+    if exc.__traceback__ is not None:
+        traceback.print_exception(exc)
+
+    return {
+        "asset": asset_name,
+        "status": "failed",
+        "message": str(exc),
+        "seconds": time.perf_counter() - started,
+    }
+
+
+def process_asset(asset_name, asset_info, series):
+    """
+    Run the pipeline for a single cleaned asset with a per-series
+    engine: train & predict → evaluate
+
+    Never raises: any failure is captured in the returned summary
+    so one bad asset cannot stop the rest of the run.
+    """
+    print(f"\n>>> Processing asset: {asset_name}")
+
+    started = time.perf_counter()
+
+    try:
         # 5. Train & predict
-        prediction = train_and_predict(clean_df)
-
-        # 6. Evaluate
-        actual_price = clean_df["price"].iloc[-1]
-        error = calculate_error(actual_price, prediction)
-
-        # 7. Store result in Supabase
-        save_result(
-            asset=asset_name,
-            predicted_price=prediction,
-            actual_price=actual_price,
-            error=error
+        with stage("forecast", asset=asset_name, rows=len(series)):
+            engine = SERIES_ENGINES[engine_for(asset_info)]
+            forecast = engine(
+                series, asset=asset_name, policy=policy_for(asset_info)
+            )
+
+        summary = evaluate_asset(asset_name, series, forecast, started)
+
+    except Exception as exc:
+        summary = failed_summary(asset_name, exc, started)
+
+    # Stage records made in this (possibly worker) process travel back
+    # with the summary
+    summary["metrics"] = instrumentation.drain()
+    return summary
+
+
+def process_batch(engine, assets, cleaned):
+    """
+    Run every (cleaned) asset of a batch engine: forecast all of them
+    in a single vectorized pass, then evaluate.
+    Returns dict asset -> run summary.
+    """
+    print(f"\n>>> Batch engine '{engine}': {list(assets)}")
+
+    started = time.perf_counter()
+    summaries = {}
+    frames = {asset_name: cleaned[asset_name] for asset_name in assets}
+
+    try:
+        with stage(f"forecast_batch.{engine}", rows=len(frames)):
+            forecasts = forecast_batch_frames(frames, engine)
+    except Exception as exc:
+        for asset_name in frames:
+            summaries[asset_name] = failed_summary(asset_name, exc, started)
+        return summaries
+
+    for asset_name, series in frames.items():
+        try:
+            summaries[asset_name] = evaluate_asset(
+                asset_name, series, forecasts[asset_name], started
+            )
+        except Exception as exc:
+            summaries[asset_name] = failed_summary(asset_name, exc, started)
+
+    return summaries
+
+
+def resolve_workers(requested, n_assets):
+    """
+    Number of worker processes to use for this run
+    (never more than the number of assets)
+    """
+    if requested is None:
+        requested = os.cpu_count() or 1
+
+    return max(1, min(int(requested), n_assets))
+
+
+def run_assets(assets, workers, full_resync=False):
+    """
+    Run every asset and return per-asset summaries in `assets` order.
+
+    Assets on a batch engine are forecast together in this process;
+    the rest run process_asset, serially or in a process pool.
+    """
+    summaries = {}
+    runnable = {}
+    series_assets = {}
+    batches = {}
+
+    # 1. Load historical data for every asset from cloud (Supabase)
+    started = time.perf_counter()
+    try:
+        with stage("load_history") as rec:
+            histories = load_cloud_histories(list(assets), full_resync=full_resync)
+            rec["rows"] = sum(len(df) for df in histories.values())
+    except Exception as exc:
+        return [failed_summary(name, exc, started) for name in assets]
+
+    # 2. Fetch every live price at once (None = fall back per asset)
+    with stage("fetch_live") as rec:
+        # Discovered assets have no live symbol
+        live_prices = fetch_daily_prices_batch(
+            [info["live_symbol"] for info in assets.values() if info.get("live_symbol")]
         )
+        rec["rows"] = sum(df is not None for df in live_prices.values())
+
+    for name, info in assets.items():
+        if name not in histories and info.get("discovered"):
+            # e.g. a historical column that was never backfilled
+            print(f"[INFO] Skipping discovered asset {name}: no price_history rows")
+            continue
+
+        if name not in histories:
+            summaries[name] = failed_summary(
+                name, ValueError(f"No history found for asset: {name}"), started
+            )
+            continue
+
+        try:
+            runnable[name] = (info, engine_for(info))
+        except ValueError as exc:
+            summaries[name] = failed_summary(name, exc, started)
+
+    # 3-4. Merge live prices and clean all assets together
+    try:
+        with stage("prepare") as rec:
+            cleaned, failed = prepare_assets(
+                {name: info for name, (info, _) in runnable.items()},
+                histories,
+                live_prices,
+                started
+            )
+            rec["rows"] = sum(len(s) for s in cleaned.values())
+    except Exception as exc:
+        cleaned, failed = {}, {
+            name: failed_summary(name, exc, started) for name in runnable
+        }
+
+    summaries.update(failed)
+
+    for name, (info, engine) in runnable.items():
+        if name not in cleaned:
+            continue
+
+        if is_batch_engine(engine):
+            batches.setdefault(engine, {})[name] = info
+        else:
+            series_assets[name] = info
+
+    if workers == 1:
+        for engine, batch_assets in batches.items():
+            summaries.update(process_batch(engine, batch_assets, cleaned))
+
+        for name, info in series_assets.items():
+            summaries[name] = process_asset(name, info, cleaned[name])
 
-        print(f"Prediction saved for {asset_name}")
+        return [summaries[name] for name in assets if name in summaries]
 
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            pool.submit(process_asset, name, info, cleaned[name]): name
+            for name, info in series_assets.items()
+        }
+
+        # Batch engines are cheap: run them here while the pool works
+        for engine, batch_assets in batches.items():
+            summaries.update(process_batch(engine, batch_assets, cleaned))
+
+        for future in as_completed(futures):
+            name = futures[future]
+
+            # A worker that dies outright (e.g. OOM) surfaces here
+            try:
+                summaries[name] = future.result()
+            except Exception as exc:
+                print(f"[ERROR] Worker for {name} crashed: {exc}")
+                summaries[name] = {
+                    "asset": name,
+                    "status": "failed",
+                    "message": f"worker crashed: {exc}",
+                    "seconds": 0.0,
+                }
+
+    return [summaries[name] for name in assets if name in summaries]
+
+
+def get_result_store(backend):
+    """
+    Results backend module exposing save_result / flush_results:
+    "cloud" (Supabase) or "local" (SQLite under data/)
+    """
+    if backend == "cloud":
+        from storage import cloud_store
+        return cloud_store
+
+    if backend == "local":
+        from storage import local_store
+        return local_store
+
+    raise ValueError(f"Unknown results backend: {backend}")
+
+
+def store_results(summaries, store):
+    """
+    7. Store every successful result and its horizon forecasts with
+    one batched write per table.
+    If the write fails, the affected assets are marked as failed.
+    """
+    stored = [s for s in summaries if s["status"] == "ok"]
+
+    for s in stored:
+        store.save_result(
+            asset=s["asset"],
+            predicted_price=s["predicted_price"],
+            actual_price=s["actual_price"],
+            error=s["error"]
+        )
+        store.save_forecast(s["asset"], s["forecast"])
+
+    try:
+        with stage("store") as rec:
+            written = store.flush_results()
+            rec["rows"] = written
+    except Exception as exc:
+        print(f"[ERROR] Storing results failed: {exc}")
+        for s in stored:
+            s["status"] = "failed"
+            s["message"] = f"store failed: {exc}"
+        return
+
+    print(f"Saved {written} predictions")
+
+
+def store_run_metrics(summaries, store):
+    """
+    9. Write the stage records of this run (parent process + every
+    worker) in one batch. Never fails the run.
+    """
+    records = instrumentation.drain()
+    for s in summaries:
+        records.extend(s.pop("metrics", []))
+
+    try:
+        written = store.save_run_metrics(records)
+    except Exception as exc:
+        print(f"[WARN] Storing run metrics failed: {exc}")
+        return
+
+    print(f"Saved {written} run metrics for run {instrumentation.current_run()}")
+
+
+def check_error_alerts(store, assets=None, threshold=ERROR_ALERT_MAPE):
+    """
+    8. Warn about assets (default: all) whose rolling MAPE exceeds the
+    threshold, read from the store's precomputed error aggregates
+    """
+    try:
+        kpis = store.load_error_stats()
+    except Exception as exc:
+        print(f"[WARN] Could not read error stats: {exc}")
+        return []
+
+    if kpis.empty:
+        return []
+
+    if assets is not None:
+        kpis = kpis[kpis["asset"].isin(list(assets))]
+
+    alerts = kpis[kpis["rolling_mape"].astype("float64") > threshold]
+
+    for row in alerts.itertuples(index=False):
+        print(
+            f"[ALERT] {row.asset}: rolling MAPE {row.rolling_mape:.2f}% "
+            f"> {threshold:.2f}% (MAE {row.rolling_mae:.4f})"
+        )
+
+    return list(alerts["asset"])
+
+
+def print_summary(summaries, elapsed):
+    print("\n==============================")
+    print("Run summary")
+    print("==============================")
+
+    for s in summaries:
+        if s["status"] == "ok":
+            print(
+                f"{s['asset']:<15} OK      {s['seconds']:7.1f}s  "
+                f"pred={s['predicted_price']:.2f}  "
+                f"actual={s['actual_price']:.2f}  "
+                f"error={s['error']:.2f}"
+            )
+        else:
+            print(
+                f"{s['asset']:<15} FAILED  {s['seconds']:7.1f}s  "
+                f"{s['message']}"
+            )
+
+    n_ok = sum(s["status"] == "ok" for s in summaries)
+    print(f"\n{n_ok}/{len(summaries)} assets succeeded in {elapsed:.1f}s")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Daily commodity forecast")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=MAX_WORKERS,
+        help="worker processes (default: settings.MAX_WORKERS, 1 = serial)"
+    )
+    parser.add_argument(
+        "--store",
+        choices=["cloud", "local"],
+        default=RESULTS_BACKEND,
+        help="where to save results (default: settings.RESULTS_BACKEND)"
+    )
+    parser.add_argument(
+        "--shard",
+        type=parse_shard,
+        default=None,
+        help="run only shard i of N (\"i/N\", 0-based); assets are "
+             "assigned by a stable hash of their name"
+    )
+    parser.add_argument(
+        "--discover",
+        action="store_true",
+        help="also forecast commodities found in the historical file "
+             "and in price_history, not only ASSET_CONFIG"
+    )
+    parser.add_argument(
+        "--full-resync",
+        action="store_true",
+        help="ignore the local price_history cache and download everything"
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    assets = discover_assets() if args.discover else dict(ASSET_CONFIG)
+
+    if args.shard:
+        index, total = args.shard
+        assets = select_shard(assets, index, total)
+        print(f"Shard {index}/{total}: {len(assets)} assets")
+
+    if not assets:
+        print("No assets in this shard")
+        return 0
+
+    workers = resolve_workers(args.workers, len(assets))
+
+    store = get_result_store(args.store)
+
+    print(f"Using {args.store} storage for results")
+    print("System setup started")
+    print("Assets to process:", list(assets))
+    print(f"Worker processes: {workers}")
+
+    run_id = instrumentation.start_run()
+    print(f"Run id: {run_id}")
+
+    started = time.perf_counter()
+    # Each shard writes its own batch of results
+    with stage("run", rows=len(assets)):
+        summaries = run_assets(assets, workers, args.full_resync)
+        store_results(summaries, store)
+        check_error_alerts(store, assets)
+
+    store_run_metrics(summaries, store)
+
+    print_summary(summaries, time.perf_counter() - started)
     print("\nSystem run completed")
 
+    # Fail the job (after every asset had its chance) if anything broke
+    if any(s["status"] != "ok" for s in summaries):
+        return 1
+
+    return 0
+
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -0,0 +1,117 @@
+import hashlib
+import json
+import os
+import time
+
+import numpy as np
+import prophet
+from prophet.serialize import model_from_json, model_to_json
+
+from config.settings import (
+    MODEL_CACHE_DIR,
+    MODEL_CACHE_MAX_AGE_DAYS,
+    MODEL_CACHE_MAX_BYTES,
+)
+
+
+def training_key(prophet_df, model_config):
+    """
+    Content hash of the training data (ds, y) plus model config.
+    Identical inputs → identical key → the fitted model can be reused.
+    """
+    ds = prophet_df["ds"].to_numpy(dtype="datetime64[ns]").view("int64")
+    y = prophet_df["y"].to_numpy(dtype="float64")
+
+    h = hashlib.sha256()
+    h.update(np.ascontiguousarray(ds).tobytes())
+    h.update(np.ascontiguousarray(y).tobytes())
+    h.update(json.dumps(model_config, sort_keys=True, default=str).encode())
+    h.update(prophet.__version__.encode())
+
+    return h.hexdigest()
+
+
+def _artifact_path(key):
+    return os.path.join(MODEL_CACHE_DIR, f"{key}.json")
+
+
+def load_cached_model(key):
+    """
+    Return the fitted Prophet model stored under key, or None
+    """
+    path = _artifact_path(key)
+
+    if not os.path.exists(path):
+        return None
+
+    try:
+        with open(path) as f:
+            model = model_from_json(f.read())
+    except (OSError, ValueError, KeyError) as exc:
+        print(f"[WARN] Dropping unreadable model artifact {key[:12]}: {exc}")
+        _remove(path)
+        return None
+
+    # Refresh mtime so eviction treats it as recently used
+    # (another process may have evicted it since it was read)
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+
+    return model
+
+
+def store_model(key, model):
+    """
+    Save a fitted Prophet model under key, then enforce cache limits
+    """
+    os.makedirs(MODEL_CACHE_DIR, exist_ok=True)
+
+    path = _artifact_path(key)
+    tmp_path = path + ".tmp"
+
+    with open(tmp_path, "w") as f:
+        f.write(model_to_json(model))
+    os.replace(tmp_path, path)
+
+    evict()
+
+
+def evict():
+    """
+    Remove artifacts older than MODEL_CACHE_MAX_AGE_DAYS, then the
+    least recently used ones until the cache fits in MODEL_CACHE_MAX_BYTES
+    """
+    if not os.path.isdir(MODEL_CACHE_DIR):
+        return
+
+    entries = []
+    for name in os.listdir(MODEL_CACHE_DIR):
+        if not name.endswith(".json"):
+            continue
+        path = os.path.join(MODEL_CACHE_DIR, name)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, path))
+
+    cutoff = time.time() - MODEL_CACHE_MAX_AGE_DAYS * 86400
+
+    # Oldest first
+    entries.sort()
+    total = sum(size for _, size, _ in entries)
+
+    for mtime, size, path in entries:
+        if mtime >= cutoff and total <= MODEL_CACHE_MAX_BYTES:
+            break
+        _remove(path)
+        total -= size
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
@@ -0,0 +1,118 @@
+import numpy as np
+
+# Vectorized baseline forecasters.
+#
+# Every function takes a price matrix Y of shape (n_assets, n_time):
+# one row per asset, right-aligned so column -1 is each asset's latest
+# observation, with NaN where an asset has no data (left padding, gaps).
+# They return forecasts of shape (n_assets, horizon) in one pass.
+
+
+def to_matrix(series_list):
+    """
+    Right-align a list of 1-D price arrays into an (n_assets, n_time)
+    matrix, left-padded with NaN
+    """
+    n_time = max((len(s) for s in series_list), default=0)
+    Y = np.full((len(series_list), n_time), np.nan, dtype="float64")
+
+    for i, s in enumerate(series_list):
+        if len(s):
+            Y[i, n_time - len(s):] = s
+
+    return Y
+
+
+def fill_missing(Y):
+    """
+    Forward-fill NaN along time, then back-fill the leading NaN
+    with each row's first valid value (rows stay NaN if fully empty)
+    """
+    n_assets, n_time = Y.shape
+    valid = ~np.isnan(Y)
+
+    # Forward fill: index of the last valid column seen so far
+    idx = np.where(valid, np.arange(n_time), 0)
+    np.maximum.accumulate(idx, axis=1, out=idx)
+    filled = Y[np.arange(n_assets)[:, None], idx]
+
+    # Leading NaN: take the first valid value of the row
+    first = np.argmax(valid, axis=1)
+    first_values = Y[np.arange(n_assets), first]
+    leading = np.arange(n_time)[None, :] < first[:, None]
+
+    return np.where(leading, first_values[:, None], filled)
+
+
+def naive(Y, horizon=1):
+    """
+    Last observed value, repeated over the horizon
+    """
+    last = fill_missing(Y)[:, -1]
+    return np.repeat(last[:, None], horizon, axis=1)
+
+
+def seasonal_naive(Y, horizon=1, season_length=5):
+    """
+    Value from one season ago (default 5 = one trading week)
+    """
+    filled = fill_missing(Y)
+    last_season = filled[:, -season_length:]
+    steps = np.arange(horizon) % season_length
+    return last_season[:, steps]
+
+
+def ewma(Y, horizon=1, alpha=0.3):
+    """
+    Exponentially weighted moving average (simple exponential smoothing),
+    computed in closed form as one matrix-vector product
+    """
+    filled = fill_missing(Y)
+    n_time = filled.shape[1]
+
+    # level_T = alpha * Σ (1-alpha)^k * y[T-1-k] + (1-alpha)^(T-1) * y[0]
+    # (first term k = T-1 replaced so weights sum to 1 with level_0 = y[0])
+    decay = (1.0 - alpha) ** np.arange(n_time)[::-1]
+    weights = alpha * decay
+    weights[0] = decay[0]
+
+    level = filled @ weights
+    return np.repeat(level[:, None], horizon, axis=1)
+
+
+def holt_winters(Y, horizon=1, alpha=0.3, beta=0.05, gamma=0.1,
+                 season_length=5, window=520):
+    """
+    Additive Holt-Winters (level + trend + season).
+
+    The recursion runs over time, but each step updates every asset at
+    once, so the cost is O(window) vector operations regardless of the
+    number of assets. Only the trailing `window` observations are used.
+    """
+    filled = fill_missing(Y)[:, -window:]
+    n_assets, n_time = filled.shape
+
+    if n_time < 2 * season_length:
+        # Not enough data to initialise seasonality → plain naive
+        return naive(Y, horizon)
+
+    # Initialise from the first two seasons
+    first = filled[:, :season_length]
+    second = filled[:, season_length:2 * season_length]
+    level = first.mean(axis=1)
+    trend = (second.mean(axis=1) - level) / season_length
+    season = first - level[:, None]
+
+    for t in range(n_time):
+        y = filled[:, t]
+        s = season[:, t % season_length]
+
+        prev_level = level
+        level = alpha * (y - s) + (1 - alpha) * (level + trend)
+        trend = beta * (level - prev_level) + (1 - beta) * trend
+        season[:, t % season_length] = gamma * (y - level) + (1 - gamma) * s
+
+    steps = np.arange(1, horizon + 1)
+    season_idx = (n_time + steps - 1) % season_length
+
+    return level[:, None] + trend[:, None] * steps[None, :] + season[:, season_idx]
@@ -1,37 +1,262 @@
+import numpy as np
 import pandas as pd
 from prophet import Prophet
 
+from config.settings import (
+    ASSET_CONFIG,
+    BASELINE_PARAMS,
+    DEFAULT_ENGINE,
+    FORECAST_UNCERTAINTY_SAMPLES,
+    HORIZON_FREQ,
+    MODEL_CACHE_ENABLED,
+    PREDICTION_HORIZON,
+    WARM_START_ENABLED,
+)
+from data.series import PriceSeries, as_series
+from model import baselines
+from model.artifact_cache import load_cached_model, store_model, training_key
+from model.training_policy import apply_policy, policy_for, prophet_overrides, resolve_policy
+from model.warm_start import load_warm_start, save_warm_start
+from utils.instrumentation import stage
 
-def train_and_predict(df):
+# One row per forecast step (horizon 1 = next period)
+FORECAST_COLUMNS = ["horizon", "target_date", "yhat", "yhat_lower", "yhat_upper"]
+
+# Prophet constructor arguments (also part of the artifact cache key)
+PROPHET_PARAMS = {
+    "daily_seasonality": False,
+    "weekly_seasonality": True,
+    "yearly_seasonality": True,
+}
+
+
+def fit_prophet(prophet_df, asset=None, init=None, use_cache=True, policy=None):
+    """
+    Fit Prophet on a ds/y frame.
+
+    The training rows and changepoint cap come from `policy` (a
+    TRAINING_POLICIES name or dict, None = DEFAULT_TRAINING_POLICY).
+    Reuses a cached model when the exact same data was fitted before,
+    otherwise fits and caches the result. The fit is warm-started from
+    `init` (Stan parameters) when given, else from the asset's previous
+    run when an asset name is given.
+    """
+    policy = resolve_policy(policy)
+    prophet_df = apply_policy(prophet_df, policy)
+    params = {**PROPHET_PARAMS, **prophet_overrides(policy)}
+
+    cache_key = None
+    if MODEL_CACHE_ENABLED and use_cache:
+        cache_key = training_key(prophet_df, params)
+        model = load_cached_model(cache_key)
+        if model is not None:
+            print(f"[INFO] Reusing cached model {cache_key[:12]}")
+            return model
+
+    # Initialize Prophet
+    model = Prophet(**params)
+
+    use_warm_start = WARM_START_ENABLED and asset is not None
+
+    if init is None and use_warm_start:
+        init = load_warm_start(asset, prophet_df, config=params)
+
+    # Train model (from yesterday's parameters when available)
+    with stage("fit", rows=len(prophet_df)):
+        if init is not None:
+            model.fit(prophet_df, init=init)
+        else:
+            model.fit(prophet_df)
+
+    if use_warm_start:
+        save_warm_start(asset, model, prophet_df, config=params)
+
+    if cache_key is not None:
+        store_model(cache_key, model)
+
+    return model
+
+
+def train_and_forecast(df, asset=None, policy=None, horizon=PREDICTION_HORIZON):
     """
     Prophet-based time series forecasting model
-    Predicts next day's price
+    Forecasts every step 1..horizon (yhat + interval) from one fit
+
+    Without an explicit policy, the asset's ASSET_CONFIG
+    "training_policy" is used.
+    Returns DataFrame with FORECAST_COLUMNS
+    """
+    if policy is None and asset in ASSET_CONFIG:
+        policy = policy_for(ASSET_CONFIG[asset])
+
+    prophet_df = to_prophet_frame(df)
+
+    model = fit_prophet(prophet_df, asset=asset, policy=policy)
+
+    return predict_horizon(model, horizon)
+
+
+def predict_horizon(model, horizon=PREDICTION_HORIZON, uncertainty_samples=FORECAST_UNCERTAINTY_SAMPLES):
+    """
+    yhat, yhat_lower and yhat_upper for the next `horizon` periods
+    after the training data. Returns DataFrame with FORECAST_COLUMNS
+
+    Only the future rows are scored, so the cost does not grow with
+    the length of the history. Bounds come from `uncertainty_samples`
+    simulated trend paths (Prophet's vectorized sampler, future rows
+    only); 0 skips sampling and leaves the bounds NaN.
+    """
+    future = model.make_future_dataframe(
+        periods=horizon, freq=HORIZON_FREQ, include_history=False
+    )
+
+    # Per call, without changing the (possibly cached) model for others
+    default_samples = model.uncertainty_samples
+    model.uncertainty_samples = uncertainty_samples
+    try:
+        with stage("predict", rows=horizon):
+            forecast = model.predict(future, vectorized=True)
+    finally:
+        model.uncertainty_samples = default_samples
+
+    missing = np.full(horizon, np.nan)
+
+    return pd.DataFrame({
+        "horizon": np.arange(1, horizon + 1),
+        "target_date": forecast["ds"].to_numpy(),
+        "yhat": forecast["yhat"].to_numpy(dtype="float64"),
+        "yhat_lower": forecast["yhat_lower"].to_numpy(dtype="float64") if uncertainty_samples else missing,
+        "yhat_upper": forecast["yhat_upper"].to_numpy(dtype="float64") if uncertainty_samples else missing,
+    })
+
+
+def predict_next(model):
+    """
+    Next period's yhat from a fitted Prophet model (point forecast only)
+    """
+    return float(predict_horizon(model, 1, uncertainty_samples=0)["yhat"].iloc[0])
+
+
+def forecast_frame(last_date, yhat, yhat_lower=None, yhat_upper=None):
+    """
+    FORECAST_COLUMNS frame for point forecasts (and optional bounds)
+    of the periods following last_date
     """
+    yhat = np.asarray(yhat, dtype="float64")
+    horizon = len(yhat)
+    missing = np.full(horizon, np.nan)
+
+    # First step strictly after last_date (a weekend last_date starts
+    # a business-day calendar on Monday, not Tuesday)
+    first = pd.Timestamp(last_date) + pd.tseries.frequencies.to_offset(HORIZON_FREQ)
+
+    return pd.DataFrame({
+        "horizon": np.arange(1, horizon + 1),
+        "target_date": pd.date_range(first, periods=horizon, freq=HORIZON_FREQ),
+        "yhat": yhat,
+        "yhat_lower": missing if yhat_lower is None else np.asarray(yhat_lower, dtype="float64"),
+        "yhat_upper": missing if yhat_upper is None else np.asarray(yhat_upper, dtype="float64"),
+    })
+
 
-    # Prophet expects columns: ds (date), y (value)
-    prophet_df = df.rename(
+def to_prophet_frame(df):
+    """
+    Prophet expects columns: ds (date), y (value).
+    A PriceSeries is wrapped without copying.
+    """
+    if isinstance(df, PriceSeries):
+        return df.to_prophet_frame()
+
+    return df.rename(
         columns={
             "date": "ds",
             "price": "y"
         }
     )[["ds", "y"]]
 
-    # Initialize Prophet
-    model = Prophet(
-        daily_seasonality=False,
-        weekly_seasonality=True,
-        yearly_seasonality=True
+
+# ================== ENGINE REGISTRY ==================
+# Batch engines take a (n_assets × n_time) price matrix and return
+# (n_assets × horizon) forecasts, so all their assets run in one pass.
+# Per-series engines take one asset's cleaned frame (and asset=) and
+# return a FORECAST_COLUMNS frame covering horizons 1..PREDICTION_HORIZON.
+
+BATCH_ENGINES = {
+    "naive": baselines.naive,
+    "seasonal_naive": baselines.seasonal_naive,
+    "ewma": baselines.ewma,
+    "holt_winters": baselines.holt_winters,
+}
+
+SERIES_ENGINES = {
+    "prophet": train_and_forecast,
+}
+
+
+def register_engine(name, fn, batch):
+    """
+    Add a forecasting engine to the registry
+    """
+    if name in BATCH_ENGINES or name in SERIES_ENGINES:
+        raise ValueError(f"Engine already registered: {name}")
+
+    (BATCH_ENGINES if batch else SERIES_ENGINES)[name] = fn
+
+
+def engine_for(asset_info):
+    """
+    Engine name configured for an asset (ASSET_CONFIG "engine" key)
+    """
+    name = asset_info.get("engine", DEFAULT_ENGINE)
+
+    if name not in BATCH_ENGINES and name not in SERIES_ENGINES:
+        raise ValueError(f"Unknown forecasting engine: {name}")
+
+    return name
+
+
+def is_batch_engine(name):
+    return name in BATCH_ENGINES
+
+
+def _run_batch(frames, engine, horizon):
+    if engine not in BATCH_ENGINES:
+        raise ValueError(f"Not a batch engine: {engine}")
+
+    assets = list(frames)
+    Y = baselines.to_matrix(
+        [as_series(frames[a]).prices for a in assets]
     )
 
-    # Train model
-    model.fit(prophet_df)
+    params = BASELINE_PARAMS.get(engine, {})
+    return assets, BATCH_ENGINES[engine](Y, horizon=horizon, **params)
+
 
-    # Create future dataframe (1 day ahead)
-    future = model.make_future_dataframe(periods=1)
+def forecast_batch(frames, engine, horizon=1):
+    """
+    Forecast several assets with a batch engine in one vectorized pass.
+
+    frames: dict asset -> cleaned PriceSeries or DataFrame (date, price)
+    Returns dict asset -> prediction `horizon` steps ahead (float)
+    """
+    assets, forecasts = _run_batch(frames, engine, horizon)
 
-    forecast = model.predict(future)
+    return {
+        asset: float(forecasts[i, horizon - 1])
+        for i, asset in enumerate(assets)
+    }
 
-    # Get tomorrow's prediction
-    prediction = forecast.iloc[-1]["yhat"]
 
-    return float(prediction)
+def forecast_batch_frames(frames, engine, horizon=PREDICTION_HORIZON):
+    """
+    Like forecast_batch, but every step 1..horizon per asset.
+    Baselines give point forecasts only (bounds are NaN).
+
+    Returns dict asset -> DataFrame with FORECAST_COLUMNS
+    """
+    assets, forecasts = _run_batch(frames, engine, horizon)
+
+    return {
+        asset: forecast_frame(as_series(frames[asset]).last_date, forecasts[i])
+        for i, asset in enumerate(assets)
+    }
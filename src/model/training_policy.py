@@ -0,0 +1,81 @@
+import pandas as pd
+
+from config.settings import DEFAULT_TRAINING_POLICY, TRAINING_POLICIES
+
+POLICY_KEYS = {"window_years", "daily_years", "tail_resolution", "n_changepoints"}
+
+
+def resolve_policy(policy):
+    """
+    Policy dict from a TRAINING_POLICIES name, an inline dict or None
+    (DEFAULT_TRAINING_POLICY)
+    """
+    if policy is None:
+        policy = DEFAULT_TRAINING_POLICY
+
+    if isinstance(policy, str):
+        if policy not in TRAINING_POLICIES:
+            raise ValueError(f"Unknown training policy: {policy}")
+        policy = TRAINING_POLICIES[policy]
+
+    unknown = set(policy) - POLICY_KEYS
+    if unknown:
+        raise ValueError(f"Unknown training policy keys: {sorted(unknown)}")
+
+    return dict(policy)
+
+
+def policy_for(asset_info):
+    """
+    Training policy configured for an asset (ASSET_CONFIG "training_policy")
+    """
+    return resolve_policy(asset_info.get("training_policy"))
+
+
+def _month_start(last_ds, years):
+    # Snap to a month start so the boundary only moves once a month
+    return (pd.Timestamp(last_ds) - pd.DateOffset(years=years)).to_period("M").to_timestamp()
+
+
+def apply_policy(prophet_df, policy):
+    """
+    Training rows (ds, y) selected by a policy:
+    trailing window first, then the part older than `daily_years`
+    aggregated to `tail_resolution` (mean y, labelled with the last
+    observed ds of each period)
+    """
+    if prophet_df.empty:
+        return prophet_df
+
+    last_ds = prophet_df["ds"].iloc[-1]
+
+    if policy.get("window_years"):
+        start = _month_start(last_ds, policy["window_years"])
+        prophet_df = prophet_df[prophet_df["ds"] >= start]
+
+    if policy.get("daily_years") and policy.get("tail_resolution"):
+        boundary = _month_start(last_ds, policy["daily_years"])
+        is_tail = prophet_df["ds"] < boundary
+
+        if is_tail.any():
+            tail = (
+                prophet_df[is_tail]
+                .groupby(pd.Grouper(key="ds", freq=policy["tail_resolution"]))
+                .agg(ds=("ds", "last"), y=("y", "mean"))
+                .dropna()
+            )
+            prophet_df = pd.concat([tail, prophet_df[~is_tail]], ignore_index=True)
+
+    return prophet_df.reset_index(drop=True)
+
+
+def prophet_overrides(policy):
+    """
+    Prophet constructor arguments set by a policy
+    """
+    overrides = {}
+
+    if policy.get("n_changepoints") is not None:
+        overrides["n_changepoints"] = int(policy["n_changepoints"])
+
+    return overrides
@@ -0,0 +1,135 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from config.settings import (
+    WARM_START_DIR,
+    WARM_START_MAX_NEW_ROWS,
+    WARM_START_MAX_SCALE_CHANGE,
+)
+
+# Stan parameters Prophet accepts as `init`
+SCALAR_PARAMS = ["k", "m", "sigma_obs"]
+VECTOR_PARAMS = ["delta", "beta"]
+
+
+def _state_path(asset):
+    return os.path.join(WARM_START_DIR, f"{asset}.json")
+
+
+def _describe_history(prophet_df):
+    """
+    Small fingerprint of the training data used to decide
+    whether yesterday's parameters are still a sensible start point
+    """
+    y = prophet_df["y"].to_numpy(dtype="float64")
+
+    return {
+        "n_rows": int(len(prophet_df)),
+        "first_ds": pd.Timestamp(prophet_df["ds"].iloc[0]).isoformat(),
+        "last_ds": pd.Timestamp(prophet_df["ds"].iloc[-1]).isoformat(),
+        "y_scale": float(np.nanmax(np.abs(y))),
+        "y_mean": float(np.nanmean(y)),
+    }
+
+
+def warm_start_params(model):
+    """
+    Stan init dict (k, m, delta, beta, sigma_obs) from a fitted model
+    """
+    init = {}
+
+    # MAP fit → params are (1, n) arrays; MCMC → average the samples
+    for name in SCALAR_PARAMS:
+        init[name] = float(np.mean(model.params[name]))
+
+    for name in VECTOR_PARAMS:
+        init[name] = np.mean(model.params[name], axis=0)
+
+    return init
+
+
+def save_warm_start(asset, model, prophet_df, config=None):
+    """
+    Persist fitted Stan parameters (k, m, delta, beta, sigma_obs)
+    for an asset so the next run can start the optimiser from them.
+    `config` (Prophet constructor arguments) is stored alongside, as
+    parameter shapes depend on it.
+    """
+    params = warm_start_params(model)
+    for name in VECTOR_PARAMS:
+        params[name] = params[name].tolist()
+
+    state = {
+        "history": _describe_history(prophet_df),
+        "params": params,
+        "config": config or {},
+    }
+
+    os.makedirs(WARM_START_DIR, exist_ok=True)
+
+    # Write-then-rename so a crashed run never leaves a half-written file
+    tmp_path = _state_path(asset) + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(state, f)
+    os.replace(tmp_path, _state_path(asset))
+
+
+def load_warm_start(asset, prophet_df, config=None):
+    """
+    Return Stan init dict for an asset, or None when a cold fit is needed
+    (no saved state, unreadable state, different model config, or the
+    history changed substantially)
+    """
+    path = _state_path(asset)
+
+    if not os.path.exists(path):
+        return None
+
+    try:
+        with open(path) as f:
+            state = json.load(f)
+        saved = state["history"]
+        params = state["params"]
+    except (OSError, ValueError, KeyError) as exc:
+        print(f"[WARN] Ignoring unreadable warm-start state for {asset}: {exc}")
+        return None
+
+    if state.get("config", {}) != (config or {}):
+        reason = "model config changed"
+    else:
+        reason = _cold_start_reason(saved, _describe_history(prophet_df))
+
+    if reason:
+        print(f"[INFO] Cold fit for {asset}: {reason}")
+        return None
+
+    init = {name: params[name] for name in SCALAR_PARAMS}
+    for name in VECTOR_PARAMS:
+        init[name] = np.asarray(params[name], dtype="float64")
+
+    return init
+
+
+def _cold_start_reason(saved, current):
+    """
+    Explain why the saved parameters should NOT be reused (None = reuse)
+    """
+    if saved["first_ds"] != current["first_ds"]:
+        return "history start date changed"
+
+    if current["last_ds"] < saved["last_ds"]:
+        return "history ends before the saved fit"
+
+    new_rows = current["n_rows"] - saved["n_rows"]
+    if new_rows < 0 or new_rows > WARM_START_MAX_NEW_ROWS:
+        return f"{new_rows} rows changed since the saved fit"
+
+    for key in ["y_scale", "y_mean"]:
+        change = abs(current[key] - saved[key]) / max(abs(saved[key]), 1e-9)
+        if change > WARM_START_MAX_SCALE_CHANGE:
+            return f"{key} moved by {change:.1%}"
+
+    return None
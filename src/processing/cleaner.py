@@ -1,16 +1,20 @@
-import pandas as pd
+from data.series import PriceSeries
+from processing.quality import clean_histories
 
-def clean_time_series(df: pd.DataFrame) -> pd.DataFrame:
-    """
-    Clean and prepare time-series data for modeling
+
+def clean_time_series(data):
     """
-    # Ensure date column is datetime
-    df["date"] = pd.to_datetime(df["date"])
+    Clean and prepare time-series data for modeling: the data-quality
+    stage (processing.quality) for a single asset.
 
-    # Sort by date
-    df = df.sort_values("date")
+    Several assets should go through clean_histories() together, in
+    one vectorized pass.
+    Returns a cleaned PriceSeries for a PriceSeries, or a (date, price)
+    DataFrame for a DataFrame (the input is not modified).
+    """
+    cleaned, _ = clean_histories({"series": data})
 
-    # Reset index
-    df = df.reset_index(drop=True)
+    if isinstance(data, PriceSeries):
+        return cleaned["series"]
 
-    return df
+    return cleaned["series"].to_frame()
@@ -0,0 +1,227 @@
+import numpy as np
+import pandas as pd
+
+from config.settings import (
+    QUALITY_CALENDAR,
+    QUALITY_FFILL_LIMIT,
+    QUALITY_MAD_FLOOR,
+    QUALITY_MAD_MIN_PERIODS,
+    QUALITY_MAD_THRESHOLD,
+    QUALITY_MAD_WINDOW,
+)
+from data.series import PriceSeries
+
+# Data-quality stage over the (date × asset) price matrix.
+# Every step runs on the whole matrix at once:
+#   1. de-duplicate (asset, date) pairs, last value wins
+#   2. reindex all assets to one shared row axis; each asset only
+#      keeps its own rows: its observed dates plus the calendar
+#      periods (gaps become NaN), never another asset's extra stamps
+#   3. mask isolated spikes: a jump far outside the rolling MAD of
+#      recent jumps that the next observation reverses
+#   4. forward-fill up to QUALITY_FFILL_LIMIT of the asset's own rows,
+#      only between its first and last observation
+# Rows still missing afterwards (leading NaN, long gaps) are dropped.
+
+QUALITY_COLUMNS = [
+    "asset", "rows_in", "duplicates", "missing", "gaps", "outliers",
+    "filled", "dropped", "rows_out", "first_date", "last_date",
+]
+
+# MAD → standard deviation for normally distributed data
+MAD_SCALE = 1.4826
+
+
+def _raw_arrays(history):
+    if isinstance(history, PriceSeries):
+        return history.dates, history.prices
+
+    dates = pd.to_datetime(history["date"]).to_numpy(dtype="datetime64[ns]")
+    return dates, history["price"].to_numpy(dtype="float64")
+
+
+def build_matrix(histories, calendar=QUALITY_CALENDAR):
+    """
+    (date × asset) float64 matrix from dict asset -> PriceSeries or
+    (date, price) DataFrame.
+
+    Timestamps are normalized to the day, so an intraday live price
+    and the daily row of the same date are duplicates.
+
+    Returns (dates, X, observed, scheduled, duplicates): the row axis,
+    the matrix (NaN = no price), which cells had a row in the input,
+    which cells are on the asset's own calendar (observed, or a
+    `calendar` period) and the number of duplicate rows dropped per
+    asset.
+    """
+    n_assets = len(histories)
+    parts = [_raw_arrays(h) for h in histories.values()]
+
+    lengths = np.array([len(d) for d, _ in parts], dtype="int64")
+    dates = np.concatenate([d for d, _ in parts]) if parts else np.array([], "datetime64[ns]")
+    dates = dates.astype("datetime64[D]").astype("datetime64[ns]")
+    prices = np.concatenate([p for _, p in parts]) if parts else np.array([], "float64")
+    columns = np.repeat(np.arange(n_assets), lengths)
+
+    # 1. De-duplicate: stable sort by (asset, date), keep the last of each run
+    order = np.lexsort((dates, columns))
+    dates, prices, columns = dates[order], prices[order], columns[order]
+
+    last = np.ones(len(dates), dtype=bool)
+    last[:-1] = (dates[1:] != dates[:-1]) | (columns[1:] != columns[:-1])
+    duplicates = np.bincount(columns[~last], minlength=n_assets)
+    dates, prices, columns = dates[last], prices[last], columns[last]
+
+    # 2. One row axis for every asset: all observed dates plus every
+    # `calendar` period between the first and last of them. A row only
+    # belongs to an asset when it observed it or it is a calendar period
+    # (e.g. another asset's weekend row is not a gap of this one)
+    row_dates = np.unique(dates)
+    periods = np.array([], "datetime64[ns]")
+    if calendar and len(row_dates):
+        periods = pd.date_range(row_dates[0], row_dates[-1], freq=calendar).to_numpy(dtype="datetime64[ns]")
+        row_dates = np.union1d(row_dates, periods)
+
+    rows = np.searchsorted(row_dates, dates)
+
+    X = np.full((len(row_dates), n_assets), np.nan)
+    X[rows, columns] = prices
+
+    observed = np.zeros(X.shape, dtype=bool)
+    observed[rows, columns] = True
+
+    scheduled = observed | np.isin(row_dates, periods)[:, None]
+
+    return row_dates, X, observed, scheduled, duplicates
+
+
+def _observed_range(valid):
+    """
+    Boolean matrix: row lies between the column's first and last
+    valid value (inclusive)
+    """
+    n_rows = valid.shape[0]
+    any_valid = valid.any(axis=0)
+
+    first = np.argmax(valid, axis=0)
+    last = n_rows - 1 - np.argmax(valid[::-1], axis=0)
+
+    rows = np.arange(n_rows)[:, None]
+    return (rows >= first) & (rows <= last) & any_valid
+
+
+def spike_mask(X, window=QUALITY_MAD_WINDOW, min_periods=QUALITY_MAD_MIN_PERIODS,
+               threshold=QUALITY_MAD_THRESHOLD, floor=QUALITY_MAD_FLOOR):
+    """
+    Cells of X that are isolated spikes (bad ticks).
+
+    Each price's relative jump from the previous observation is scored
+    against the rolling MAD of the previous `window` jumps (floored at
+    `floor`). A score above `threshold` is a spike only when the next
+    observation reverses at least half of the jump. Trends, contract
+    rolls and other level shifts (and the latest price, which has no
+    successor yet) are kept.
+    """
+    frame = pd.DataFrame(X)
+
+    previous = frame.ffill().shift(1).to_numpy()
+    following = frame.bfill().shift(-1).to_numpy()
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        jump = (X - previous) / np.abs(previous)
+        net = (following - previous) / np.abs(previous)
+
+    mad = (
+        pd.DataFrame(np.abs(jump))
+        .shift(1)
+        .rolling(window, min_periods=min_periods)
+        .median()
+        .to_numpy()
+    )
+    scale = np.maximum(MAD_SCALE * mad, floor)
+
+    with np.errstate(invalid="ignore"):
+        return (np.abs(jump) > threshold * scale) & (np.abs(net) <= 0.5 * np.abs(jump))
+
+
+def clean_matrix(X, observed, scheduled=None, ffill_limit=QUALITY_FFILL_LIMIT, **spike_params):
+    """
+    Mask spikes in X and forward-fill short gaps.
+
+    scheduled: cells on each column's own calendar (default: every
+    cell); the others stay NaN and do not count towards ffill_limit.
+    Returns (cleaned matrix, per-column counts dict)
+    """
+    if scheduled is None:
+        scheduled = np.ones(X.shape, dtype=bool)
+
+    X = np.where(np.isfinite(X) & scheduled, X, np.nan)
+    valid = ~np.isnan(X)
+    own = _observed_range(valid) & scheduled
+
+    # 3. Isolated spikes → missing
+    spikes = spike_mask(X, **spike_params) & valid
+    X[spikes] = np.nan
+
+    # 4. Limited forward fill, never before the first or after the
+    # last observation of an asset; the limit counts the asset's own
+    # rows since its last valid price
+    position = np.cumsum(scheduled, axis=0)
+    last_valid = pd.DataFrame(np.where(np.isnan(X), np.nan, position)).ffill().to_numpy()
+
+    filled = pd.DataFrame(X).ffill().to_numpy()
+    filled = np.where(own & (position - last_valid <= ffill_limit), filled, np.nan)
+
+    still_missing = np.isnan(filled)
+
+    counts = {
+        "missing": (observed & ~valid).sum(axis=0),
+        "gaps": (own & ~observed).sum(axis=0),
+        "outliers": spikes.sum(axis=0),
+        "filled": (np.isnan(X) & ~still_missing).sum(axis=0),
+        "dropped": (own & still_missing).sum(axis=0),
+    }
+
+    return filled, counts
+
+
+def clean_histories(histories, calendar=QUALITY_CALENDAR, **params):
+    """
+    Run the data-quality stage on several assets at once.
+
+    histories: dict asset -> PriceSeries or (date, price) DataFrame
+    Returns (dict asset -> cleaned PriceSeries without NaN, quality
+    DataFrame with QUALITY_COLUMNS, one row per asset)
+    """
+    assets = list(histories)
+    dates, X, observed, scheduled, duplicates = build_matrix(histories, calendar)
+    filled, counts = clean_matrix(X, observed, scheduled, **params)
+
+    # Split the matrix back into per-asset series (column-major order
+    # so each asset's rows are contiguous and date-sorted)
+    keep = ~np.isnan(filled.T)
+    _, row_index = np.nonzero(keep)
+    values = filled.T[keep]
+    rows_out = keep.sum(axis=1)
+    bounds = np.cumsum(rows_out)[:-1]
+
+    cleaned = {
+        asset: PriceSeries(d, v)
+        for asset, d, v in zip(
+            assets,
+            np.split(dates[row_index], bounds),
+            np.split(values, bounds)
+        )
+    }
+
+    quality = pd.DataFrame({
+        "asset": assets,
+        "rows_in": [len(h) for h in histories.values()],
+        "duplicates": duplicates,
+        **counts,
+        "rows_out": rows_out,
+        "first_date": [s.first_date for s in cleaned.values()],
+        "last_date": [s.last_date for s in cleaned.values()],
+    }, columns=QUALITY_COLUMNS)
+
+    return cleaned, quality
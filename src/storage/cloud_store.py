@@ -1,26 +1,34 @@
 
-import os
-from datetime import date
-from supabase import create_client, Client
-from dotenv import load_dotenv
+import pandas as pd
+from datetime import date, datetime, timedelta, timezone
 
-# Load .env file (local dev)
-load_dotenv()
+from config.settings import (
+    RESULTS_BATCH_SIZE,
+    RESULTS_FLUSH_BACKOFF_BASE,
+    RESULTS_FLUSH_RETRIES,
+)
+from evaluation.metrics import empty_stats, stats_kpis, update_stats
+from utils.instrumentation import METRIC_COLUMNS, stage, timed
+from utils.pagination import fetch_all
+from utils.retry import retry_call
+from utils.supabase_client import create_supabase_client
 
-# Load credentials from environment (GitHub Secrets / local env)
-SUPABASE_URL = os.getenv("SUPABASE_URL")
-SUPABASE_KEY = os.getenv("SUPABASE_SERVICE_KEY")
+# Supabase client (or the SQLite stand-in, see utils.supabase_client)
+supabase = create_supabase_client()
 
-if not SUPABASE_URL or not SUPABASE_KEY:
-    raise ValueError("Supabase credentials not found in environment variables")
-
-# Create Supabase client
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
+# Rows waiting to be written, keyed by (date, asset) so a second
+# result for the same day replaces the first instead of duplicating it
+_pending = {}
+# Horizon forecasts waiting to be written, keyed by (run_date, asset, horizon)
+_pending_forecasts = {}
 
 
 def save_result(asset, predicted_price, actual_price, error):
     """
-    Save daily forecast result to Supabase (forecast_results table)
+    Queue daily forecast result for Supabase (forecast_results table).
+
+    Rows are written by flush_results() (automatically once
+    RESULTS_BATCH_SIZE rows are queued).
     """
 
     payload = {
@@ -31,13 +39,199 @@ def save_result(asset, predicted_price, actual_price, error):
         "error": float(error)
     }
 
+    _pending[(payload["date"], asset)] = payload
+
+    if len(_pending) >= RESULTS_BATCH_SIZE:
+        flush_results()
+
+
+def save_forecast(asset, forecast):
+    """
+    Queue an asset's horizon forecasts (DataFrame with horizon,
+    target_date, yhat, yhat_lower, yhat_upper) made today for the
+    forecast_horizons table; written by flush_results()
+    """
+    today = date.today().isoformat()
+    target_dates = pd.to_datetime(forecast["target_date"]).dt.strftime("%Y-%m-%d")
+
+    for h, target, yhat, lower, upper in zip(
+        forecast["horizon"], target_dates, forecast["yhat"],
+        forecast["yhat_lower"], forecast["yhat_upper"]
+    ):
+        _pending_forecasts[(today, asset, int(h))] = {
+            "run_date": today,
+            "asset": asset,
+            "horizon": int(h),
+            "target_date": target,
+            "yhat": float(yhat),
+            # JSON has no NaN: baselines have no interval
+            "yhat_lower": None if pd.isna(lower) else float(lower),
+            "yhat_upper": None if pd.isna(upper) else float(upper),
+        }
+
+
+def _upsert(rows, table="forecast_results", on_conflict="date,asset"):
+    # Requires a unique index on the on_conflict columns
+    # (forecast_results (date, asset),
+    #  forecast_horizons (run_date, asset, horizon)),
+    # created by supabase/migrations/20261018120000_forecast_schema.sql
+    with stage(f"supabase.upsert.{table}", rows=len(rows)):
+        response = (
+            supabase
+            .table(table)
+            .upsert(rows, on_conflict=on_conflict)
+            .execute()
+        )
+
+    # Defensive check (optional, safe)
+    if response.data is None:
+        raise RuntimeError("Upsert failed: no data returned from Supabase")
+
+
+@timed("supabase.forecast_error_stats")
+def _update_error_stats(rows):
+    """
+    Fold newly written rows into forecast_error_stats: one row per
+    asset holding the running aggregates (state) and the KPIs derived
+    from them, so readers never scan forecast_results.
+
+    Requires the forecast_error_stats table (primary key asset) from
+    supabase/migrations/20261018120000_forecast_schema.sql, which also
+    seeds it from existing forecast_results.
+    """
+    assets = sorted({r["asset"] for r in rows})
+
     response = (
         supabase
-        .table("forecast_results")
-        .insert(payload)
+        .table("forecast_error_stats")
+        .select("asset, state")
+        .in_("asset", assets)
         .execute()
     )
+    states = {r["asset"]: r["state"] for r in response.data or []}
 
-    # Defensive check (optional, safe)
-    if response.data is None:
-        raise RuntimeError("Insert failed: no data returned from Supabase")
+    for row in sorted(rows, key=lambda r: r["date"]):
+        stats = states.get(row["asset"]) or empty_stats(row["asset"])
+        states[row["asset"]] = update_stats(
+            stats, row["date"], row["actual_price"], row["predicted_price"]
+        )
+
+    payload = [{**stats_kpis(states[a]), "state": states[a]} for a in assets]
+
+    (
+        supabase
+        .table("forecast_error_stats")
+        .upsert(payload, on_conflict="asset")
+        .execute()
+    )
+
+
+def save_run_metrics(records):
+    """
+    Write instrumentation records (utils.instrumentation.METRIC_COLUMNS)
+    to the run_metrics table, RESULTS_BATCH_SIZE rows per upsert.
+
+    Requires the unique key on run_metrics
+    (run_id, pid, started_at, stage), so a retried batch is not
+    stored twice.
+
+    Returns number of rows written.
+    """
+    for start in range(0, len(records), RESULTS_BATCH_SIZE):
+        rows = records[start:start + RESULTS_BATCH_SIZE]
+
+        retry_call(
+            lambda: _upsert(rows, "run_metrics", "run_id,pid,started_at,stage"),
+            attempts=RESULTS_FLUSH_RETRIES + 1,
+            base_delay=RESULTS_FLUSH_BACKOFF_BASE,
+            label="run_metrics upsert"
+        )
+
+    return len(records)
+
+
+def load_run_metrics(days=30):
+    """
+    Stage records of runs started in the last `days` days, oldest first
+    """
+    since = (datetime.now(timezone.utc) - timedelta(days=days)).isoformat()
+
+    rows = fetch_all(
+        lambda count: (
+            supabase
+            .table("run_metrics")
+            .select(", ".join(METRIC_COLUMNS), count=count)
+            .gte("started_at", since)
+            .order("started_at")
+            .order("pid")
+            .order("stage")
+        )
+    )
+
+    df = pd.DataFrame(rows, columns=METRIC_COLUMNS)
+    df["started_at"] = pd.to_datetime(df["started_at"], utc=True, errors="coerce")
+
+    return df
+
+
+def load_error_stats():
+    """
+    Precomputed error KPIs per asset (see evaluation.metrics.stats_kpis)
+    """
+    response = (
+        supabase
+        .table("forecast_error_stats")
+        .select("*")
+        .order("asset")
+        .execute()
+    )
+
+    return pd.DataFrame(response.data or []).drop(columns="state", errors="ignore")
+
+
+def flush_results():
+    """
+    Write all queued results and horizon forecasts with one upsert per
+    RESULTS_BATCH_SIZE rows, retrying failed batches. Re-running on the
+    same day overwrites that day's rows instead of duplicating them.
+
+    Returns number of result rows written.
+    """
+    written = 0
+
+    while _pending:
+        keys = list(_pending)[:RESULTS_BATCH_SIZE]
+        rows = [_pending[k] for k in keys]
+
+        retry_call(
+            lambda: _upsert(rows),
+            attempts=RESULTS_FLUSH_RETRIES + 1,
+            base_delay=RESULTS_FLUSH_BACKOFF_BASE,
+            label="forecast_results upsert"
+        )
+        retry_call(
+            lambda: _update_error_stats(rows),
+            attempts=RESULTS_FLUSH_RETRIES + 1,
+            base_delay=RESULTS_FLUSH_BACKOFF_BASE,
+            label="forecast_error_stats update"
+        )
+
+        for k in keys:
+            del _pending[k]
+        written += len(rows)
+
+    while _pending_forecasts:
+        keys = list(_pending_forecasts)[:RESULTS_BATCH_SIZE]
+        rows = [_pending_forecasts[k] for k in keys]
+
+        retry_call(
+            lambda: _upsert(rows, "forecast_horizons", "run_date,asset,horizon"),
+            attempts=RESULTS_FLUSH_RETRIES + 1,
+            base_delay=RESULTS_FLUSH_BACKOFF_BASE,
+            label="forecast_horizons upsert"
+        )
+
+        for k in keys:
+            del _pending_forecasts[k]
+
+    return written
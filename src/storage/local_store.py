@@ -1,34 +1,351 @@
 import pandas as pd
+import json
 import os
-from datetime import date
+import sqlite3
+from datetime import date, datetime, timedelta, timezone
 
+from config.settings import RESULTS_BATCH_SIZE
+from evaluation.metrics import empty_stats, stats_from_frame, stats_kpis, update_stats
+from utils.instrumentation import METRIC_COLUMNS
+
+RESULTS_DB = "data/results.db"
 RESULTS_FILE = "data/results.csv"
 
+COLUMNS = ["date", "asset", "predicted_price", "actual_price", "error"]
+
+FORECAST_COLUMNS = [
+    "run_date", "asset", "horizon", "target_date",
+    "yhat", "yhat_lower", "yhat_upper",
+]
+
+# Rows waiting to be written, keyed by (date, asset)
+_pending = {}
+# Horizon forecasts waiting to be written, keyed by (run_date, asset, horizon)
+_pending_forecasts = {}
+
+
+def _connect():
+    """
+    Open the results database, creating the table and its unique
+    (date, asset) index on first use. A legacy results.csv is
+    imported once when the database is created.
+    """
+    os.makedirs(os.path.dirname(RESULTS_DB) or ".", exist_ok=True)
+    is_new = not os.path.exists(RESULTS_DB)
+
+    conn = sqlite3.connect(RESULTS_DB)
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS forecast_results (
+            date TEXT NOT NULL,
+            asset TEXT NOT NULL,
+            predicted_price REAL,
+            actual_price REAL,
+            error REAL
+        )
+        """
+    )
+    conn.execute(
+        "CREATE UNIQUE INDEX IF NOT EXISTS forecast_results_date_asset "
+        "ON forecast_results (date, asset)"
+    )
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS forecast_horizons (
+            run_date TEXT NOT NULL,
+            asset TEXT NOT NULL,
+            horizon INTEGER NOT NULL,
+            target_date TEXT NOT NULL,
+            yhat REAL,
+            yhat_lower REAL,
+            yhat_upper REAL,
+            UNIQUE (run_date, asset, horizon)
+        )
+        """
+    )
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS run_metrics (
+            run_id TEXT NOT NULL,
+            started_at TEXT NOT NULL,
+            stage TEXT NOT NULL,
+            asset TEXT,
+            wall_s REAL,
+            cpu_s REAL,
+            peak_rss_mb REAL,
+            rows INTEGER,
+            status TEXT,
+            pid INTEGER,
+            UNIQUE (run_id, pid, started_at, stage)
+        )
+        """
+    )
+    # Running error aggregates per asset (evaluation.metrics stats as JSON)
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS error_stats (
+            asset TEXT PRIMARY KEY,
+            state TEXT NOT NULL
+        )
+        """
+    )
+
+    if is_new and os.path.exists(RESULTS_FILE):
+        legacy = pd.read_csv(RESULTS_FILE)
+        legacy["date"] = pd.to_datetime(legacy["date"]).dt.strftime("%Y-%m-%d")
+        _upsert(conn, legacy[COLUMNS].itertuples(index=False, name=None))
+        _write_stats(conn, stats_from_frame(legacy))
+        print(f"Imported {len(legacy)} rows from {RESULTS_FILE}")
+
+    return conn
+
+
+def _upsert(conn, rows):
+    with conn:
+        conn.executemany(
+            """
+            INSERT INTO forecast_results
+                (date, asset, predicted_price, actual_price, error)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT (date, asset) DO UPDATE SET
+                predicted_price = excluded.predicted_price,
+                actual_price = excluded.actual_price,
+                error = excluded.error
+            """,
+            rows
+        )
+
+
+def _upsert_forecasts(conn, rows):
+    with conn:
+        conn.executemany(
+            """
+            INSERT INTO forecast_horizons
+                (run_date, asset, horizon, target_date, yhat, yhat_lower, yhat_upper)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (run_date, asset, horizon) DO UPDATE SET
+                target_date = excluded.target_date,
+                yhat = excluded.yhat,
+                yhat_lower = excluded.yhat_lower,
+                yhat_upper = excluded.yhat_upper
+            """,
+            rows
+        )
+
+
+def _read_stats(conn, assets):
+    marks = ",".join("?" * len(assets))
+    cur = conn.execute(
+        f"SELECT asset, state FROM error_stats WHERE asset IN ({marks})",
+        list(assets)
+    )
+    return {asset: json.loads(state) for asset, state in cur}
+
+
+def _write_stats(conn, states):
+    with conn:
+        conn.executemany(
+            """
+            INSERT INTO error_stats (asset, state) VALUES (?, ?)
+            ON CONFLICT (asset) DO UPDATE SET state = excluded.state
+            """,
+            [(asset, json.dumps(stats)) for asset, stats in states.items()]
+        )
+
+
+def _update_stats(conn, rows):
+    """
+    Fold newly written (date, asset, predicted, actual, error) rows
+    into the per-asset running error aggregates
+    """
+    states = _read_stats(conn, {r[1] for r in rows})
+
+    for day, asset, predicted, actual, _ in sorted(rows):
+        stats = states.get(asset) or empty_stats(asset)
+        states[asset] = update_stats(stats, day, actual, predicted)
+
+    _write_stats(conn, states)
+
 
 def save_result(asset, predicted_price, actual_price, error):
-    today = date.today()
-
-    new_row = {
-        "date": today,
-        "asset": asset,
-        "predicted_price": predicted_price,
-        "actual_price": actual_price,
-        "error": error
-    }
-
-    if os.path.exists(RESULTS_FILE):
-        df = pd.read_csv(RESULTS_FILE)
-        df["date"] = pd.to_datetime(df["date"]).dt.date
-
-        # Remove existing record for same date & asset
-        df = df[
-            ~((df["date"] == today) & (df["asset"] == asset))
-        ]
-
-        df = pd.concat([df, pd.DataFrame([new_row])], ignore_index=True)
-    else:
-        df = pd.DataFrame([new_row])
-    df = df.sort_values(["date", "asset"])
+    """
+    Queue daily forecast result for the local results database.
+
+    Rows are written by flush_results() (automatically once
+    RESULTS_BATCH_SIZE rows are queued).
+    """
+    today = date.today().isoformat()
+
+    _pending[(today, asset)] = (
+        today,
+        asset,
+        float(predicted_price),
+        float(actual_price),
+        float(error)
+    )
+
+    if len(_pending) >= RESULTS_BATCH_SIZE:
+        flush_results()
+
+
+def save_forecast(asset, forecast):
+    """
+    Queue an asset's horizon forecasts (DataFrame with horizon,
+    target_date, yhat, yhat_lower, yhat_upper) made today
+    """
+    today = date.today().isoformat()
+    target_dates = pd.to_datetime(forecast["target_date"]).dt.strftime("%Y-%m-%d")
+
+    for h, target, yhat, lower, upper in zip(
+        forecast["horizon"], target_dates, forecast["yhat"],
+        forecast["yhat_lower"], forecast["yhat_upper"]
+    ):
+        _pending_forecasts[(today, asset, int(h))] = (
+            today, asset, int(h), target,
+            float(yhat),
+            None if pd.isna(lower) else float(lower),
+            None if pd.isna(upper) else float(upper),
+        )
+
 
+def flush_results():
+    """
+    Write all queued results and horizon forecasts in one transaction
+    per table. An existing row for the same (date, asset) or
+    (run_date, asset, horizon) is replaced.
+
+    Returns number of result rows written.
+    """
+    if not _pending and not _pending_forecasts:
+        return 0
+
+    rows = list(_pending.values())
+
+    conn = _connect()
+    try:
+        if rows:
+            _upsert(conn, rows)
+            _update_stats(conn, rows)
+        if _pending_forecasts:
+            _upsert_forecasts(conn, list(_pending_forecasts.values()))
+    finally:
+        conn.close()
+
+    _pending.clear()
+    _pending_forecasts.clear()
+
+    return len(rows)
+
+
+def load_results(asset=None):
+    """
+    Read stored results (optionally for one asset), sorted by date & asset
+    """
+    conn = _connect()
+    try:
+        query = "SELECT * FROM forecast_results"
+        params = ()
+
+        if asset is not None:
+            query += " WHERE asset = ?"
+            params = (asset,)
+
+        df = pd.read_sql_query(query + " ORDER BY date, asset", conn, params=params)
+    finally:
+        conn.close()
+
+    df["date"] = pd.to_datetime(df["date"])
+
+    return df
+
+
+def save_run_metrics(records):
+    """
+    Write instrumentation records (utils.instrumentation.METRIC_COLUMNS)
+    in one transaction. Returns number of rows written.
+    """
+    if not records:
+        return 0
+
+    conn = _connect()
+    try:
+        with conn:
+            conn.executemany(
+                f"""
+                INSERT OR REPLACE INTO run_metrics ({", ".join(METRIC_COLUMNS)})
+                VALUES ({", ".join("?" * len(METRIC_COLUMNS))})
+                """,
+                [tuple(r.get(c) for c in METRIC_COLUMNS) for r in records]
+            )
+    finally:
+        conn.close()
+
+    return len(records)
+
+
+def load_run_metrics(days=30):
+    """
+    Stage records of runs started in the last `days` days, oldest first
+    """
+    since = (datetime.now(timezone.utc) - timedelta(days=days)).isoformat()
+
+    conn = _connect()
+    try:
+        df = pd.read_sql_query(
+            f"""
+            SELECT {", ".join(METRIC_COLUMNS)} FROM run_metrics
+            WHERE started_at >= ?
+            ORDER BY started_at, pid, stage
+            """,
+            conn,
+            params=(since,)
+        )
+    finally:
+        conn.close()
+
+    df["started_at"] = pd.to_datetime(df["started_at"], utc=True, errors="coerce")
+
+    return df
+
+
+def load_error_stats():
+    """
+    Precomputed error KPIs per asset (one row each, see
+    evaluation.metrics.stats_kpis) without reading result history
+    """
+    conn = _connect()
+    try:
+        states = conn.execute("SELECT state FROM error_stats ORDER BY asset").fetchall()
+    finally:
+        conn.close()
+
+    return pd.DataFrame([stats_kpis(json.loads(state)) for (state,) in states])
+
+
+def rebuild_error_stats():
+    """
+    Recompute the running error aggregates from all stored results
+    (e.g. after rows were edited by hand)
+    """
+    conn = _connect()
+    try:
+        df = pd.read_sql_query("SELECT * FROM forecast_results", conn)
+        with conn:
+            conn.execute("DELETE FROM error_stats")
+        _write_stats(conn, stats_from_frame(df))
+    finally:
+        conn.close()
+
+
+def export_results(path=RESULTS_FILE):
+    """
+    Export all stored results to CSV or Parquet (chosen by extension)
+    """
+    df = load_results()
+
+    if path.endswith(".parquet"):
+        df.to_parquet(path, index=False)
+    else:
+        df.to_csv(path, index=False, date_format="%Y-%m-%d")
 
-    df.to_csv(RESULTS_FILE, index=False)
+    return path
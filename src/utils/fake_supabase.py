@@ -0,0 +1,313 @@
+import json
+import sqlite3
+import threading
+import time
+
+# In-process stand-in for the Supabase client, backed by SQLite.
+#
+# Implements the part of the PostgREST query builder this project uses:
+#   table().select(cols, count=).eq/neq/gt/gte/lt/lte/in_/is_/not_
+#   .order(col, desc=).range(a, b).limit(n).execute()
+#   table().insert(rows) / .upsert(rows, on_conflict=) / .delete()...execute()
+# Tables and columns are created on first write; dict/list values are
+# stored as JSON. The read-only views of the Supabase migration are
+# defined as SQLite views (empty until their tables exist). `latency` seconds are slept per request (plus
+# `row_latency` per row sent or received) outside the database lock,
+# so concurrent callers overlap the way real round trips do.
+
+
+# Views from supabase/migrations/, in SQLite syntax
+VIEWS = {
+    "price_history_assets": "SELECT DISTINCT asset FROM price_history",
+    "price_history_latest": "SELECT asset, MAX(date) AS date FROM price_history GROUP BY asset",
+}
+
+
+class FakeResponse:
+    def __init__(self, data, count=None):
+        self.data = data
+        self.count = count
+
+
+def _quote(name):
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _encode(value):
+    return json.dumps(value) if isinstance(value, (dict, list)) else value
+
+
+def _decode(value):
+    if isinstance(value, str) and value[:1] in ("{", "["):
+        try:
+            return json.loads(value)
+        except ValueError:
+            return value
+    return value
+
+
+class FakeQuery:
+    def __init__(self, client, table):
+        self._client = client
+        self._table = table
+        self._action = "select"
+        self._columns = "*"
+        self._count = None
+        self._filters = []
+        self._negate = False
+        self._orders = []
+        self._range = None
+        self._limit = None
+        self._rows = None
+        self._on_conflict = None
+
+    # ---- actions ----
+    def select(self, columns="*", count=None):
+        self._action, self._columns, self._count = "select", columns, count
+        return self
+
+    def insert(self, rows):
+        self._action, self._rows = "insert", rows if isinstance(rows, list) else [rows]
+        return self
+
+    def upsert(self, rows, on_conflict=None):
+        self._action, self._rows = "upsert", rows if isinstance(rows, list) else [rows]
+        self._on_conflict = on_conflict
+        return self
+
+    def delete(self):
+        self._action = "delete"
+        return self
+
+    # ---- filters ----
+    @property
+    def not_(self):
+        self._negate = True
+        return self
+
+    def _filter(self, sql, params):
+        if self._negate:
+            sql, self._negate = f"NOT ({sql})", False
+        self._filters.append((sql, params))
+        return self
+
+    def eq(self, column, value):
+        return self._filter(f"{_quote(column)} = ?", [value])
+
+    def neq(self, column, value):
+        return self._filter(f"{_quote(column)} != ?", [value])
+
+    def gt(self, column, value):
+        return self._filter(f"{_quote(column)} > ?", [value])
+
+    def gte(self, column, value):
+        return self._filter(f"{_quote(column)} >= ?", [value])
+
+    def lt(self, column, value):
+        return self._filter(f"{_quote(column)} < ?", [value])
+
+    def lte(self, column, value):
+        return self._filter(f"{_quote(column)} <= ?", [value])
+
+    def in_(self, column, values):
+        values = list(values)
+        marks = ",".join("?" * len(values)) or "NULL"
+        return self._filter(f"{_quote(column)} IN ({marks})", values)
+
+    def is_(self, column, value):
+        if value in (None, "null"):
+            return self._filter(f"{_quote(column)} IS NULL", [])
+        return self._filter(f"{_quote(column)} IS ?", [value])
+
+    # ---- modifiers ----
+    def order(self, column, desc=False):
+        self._orders.append((column, desc))
+        return self
+
+    def range(self, start, end):
+        self._range = (start, end)
+        return self
+
+    def limit(self, n):
+        self._limit = n
+        return self
+
+    # ---- execution ----
+    def _where(self):
+        if not self._filters:
+            return "", []
+        sql = " WHERE " + " AND ".join(f for f, _ in self._filters)
+        params = [p for _, ps in self._filters for p in ps]
+        return sql, params
+
+    def execute(self):
+        client = self._client
+        n_rows = len(self._rows) if self._rows is not None else 0
+
+        with client._lock:
+            response = getattr(self, f"_execute_{self._action}")(client._conn)
+            client.requests += 1
+
+        if self._action == "select":
+            n_rows = len(response.data)
+        delay = client.latency + client.row_latency * n_rows
+        if delay:
+            time.sleep(delay)
+
+        return response
+
+    def _execute_select(self, conn):
+        if not self._client._table_exists(self._table):
+            return FakeResponse([], 0 if self._count else None)
+
+        where, params = self._where()
+        table = _quote(self._table)
+
+        if self._columns.strip() == "*":
+            columns = "*"
+        else:
+            columns = ", ".join(_quote(c.strip()) for c in self._columns.split(","))
+
+        sql = f"SELECT {columns} FROM {table}{where}"
+        if self._orders:
+            # Index the sort key once, like the indexes a real schema has
+            self._client._ensure_index(self._table, [c for c, _ in self._orders])
+            sql += " ORDER BY " + ", ".join(
+                f"{_quote(c)} {'DESC' if desc else 'ASC'}" for c, desc in self._orders
+            )
+
+        limit, offset = self._limit, 0
+        if self._range is not None:
+            offset = self._range[0]
+            limit = self._range[1] - self._range[0] + 1
+        if limit is not None or offset:
+            sql += f" LIMIT {-1 if limit is None else int(limit)} OFFSET {int(offset)}"
+
+        count = None
+        try:
+            if self._count:
+                count = conn.execute(f"SELECT COUNT(*) FROM {table}{where}", params).fetchone()[0]
+            cur = conn.execute(sql, params)
+        except sqlite3.OperationalError as exc:
+            # e.g. a column that was never written, or a view over a
+            # table that was never written
+            if "no such column" in str(exc) or "no such table" in str(exc):
+                return FakeResponse([], 0 if self._count else None)
+            raise
+
+        names = [d[0] for d in cur.description]
+        data = [{n: _decode(v) for n, v in zip(names, row)} for row in cur]
+
+        return FakeResponse(data, count)
+
+    def _write(self, conn, conflict):
+        if not self._rows:
+            return FakeResponse([])
+
+        columns = sorted({c for row in self._rows for c in row})
+        self._client._ensure_table(self._table, columns)
+
+        names = ", ".join(_quote(c) for c in columns)
+        marks = ", ".join("?" * len(columns))
+        sql = f"INSERT INTO {_quote(self._table)} ({names}) VALUES ({marks})"
+
+        if conflict:
+            keys = [c.strip() for c in conflict.split(",")]
+            self._client._ensure_unique(self._table, keys)
+            updates = [c for c in columns if c not in keys]
+            sql += f" ON CONFLICT ({', '.join(_quote(k) for k in keys)}) DO "
+            sql += "UPDATE SET " + ", ".join(
+                f"{_quote(c)} = excluded.{_quote(c)}" for c in updates
+            ) if updates else "NOTHING"
+
+        with conn:
+            conn.executemany(
+                sql, [tuple(_encode(row.get(c)) for c in columns) for row in self._rows]
+            )
+
+        return FakeResponse([dict(row) for row in self._rows])
+
+    def _execute_insert(self, conn):
+        return self._write(conn, None)
+
+    def _execute_upsert(self, conn):
+        return self._write(conn, self._on_conflict)
+
+    def _execute_delete(self, conn):
+        if not self._client._table_exists(self._table):
+            return FakeResponse([])
+
+        where, params = self._where()
+        with conn:
+            conn.execute(f"DELETE FROM {_quote(self._table)}{where}", params)
+        return FakeResponse([])
+
+
+class FakeSupabase:
+    def __init__(self, path=":memory:", latency=0.0, row_latency=0.0):
+        """
+        path: SQLite file (shared between clients/processes) or ":memory:"
+        latency: seconds added to every request
+        row_latency: seconds added per row sent or received
+        """
+        self.path = path
+        self.latency = latency
+        self.row_latency = row_latency
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=60)
+
+        with self._conn:
+            for name, sql in VIEWS.items():
+                self._conn.execute(f"CREATE VIEW IF NOT EXISTS {_quote(name)} AS {sql}")
+
+    def table(self, name):
+        return FakeQuery(self, name)
+
+    def _table_exists(self, name):
+        row = self._conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type IN ('table', 'view') AND name = ?", (name,)
+        ).fetchone()
+        return row is not None
+
+    def _ensure_table(self, name, columns):
+        table = _quote(name)
+        with self._conn:
+            self._conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {table} ({', '.join(_quote(c) for c in columns)})"
+            )
+            existing = {r[1] for r in self._conn.execute(f"PRAGMA table_info({table})")}
+            for c in columns:
+                if c not in existing:
+                    self._conn.execute(f"ALTER TABLE {table} ADD COLUMN {_quote(c)}")
+
+    def _ensure_index(self, name, keys):
+        index = _quote(f"{name}__{'_'.join(keys)}__idx")
+        try:
+            with self._conn:
+                self._conn.execute(
+                    f"CREATE INDEX IF NOT EXISTS {index} "
+                    f"ON {_quote(name)} ({', '.join(_quote(k) for k in keys)})"
+                )
+        except sqlite3.OperationalError:
+            # Unknown column: the select reports it
+            pass
+
+    def _ensure_unique(self, name, keys):
+        index = _quote(f"{name}__{'_'.join(keys)}__key")
+        with self._conn:
+            self._conn.execute(
+                f"CREATE UNIQUE INDEX IF NOT EXISTS {index} "
+                f"ON {_quote(name)} ({', '.join(_quote(k) for k in keys)})"
+            )
+
+    def reset(self):
+        """
+        Drop every table (fresh database, same client)
+        """
+        with self._lock, self._conn:
+            tables = [r[0] for r in self._conn.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'table'"
+            )]
+            for t in tables:
+                self._conn.execute(f"DROP TABLE {_quote(t)}")
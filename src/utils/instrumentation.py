@@ -0,0 +1,154 @@
+import contextvars
+import functools
+import json
+import os
+import resource
+import sys
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+# Lightweight per-stage instrumentation.
+#
+# stage() measures wall time, CPU time and the process's peak RSS for a
+# block of work, tags it with the current run and asset, prints it as
+# one JSON line on stderr and keeps it in memory until drain().
+# Nothing is recorded until start_run() is called, so library code can
+# be instrumented unconditionally (the dashboard never starts a run).
+
+RUN_ID_ENV = "FORECAST_RUN_ID"
+
+METRIC_COLUMNS = [
+    "run_id",
+    "started_at",
+    "stage",
+    "asset",
+    "wall_s",
+    "cpu_s",
+    "peak_rss_mb",
+    "rows",
+    "status",
+    "pid",
+]
+
+_records = []
+_records_lock = threading.Lock()
+_asset = contextvars.ContextVar("instrumented_asset", default=None)
+
+# Forked workers start empty; the parent still owns its own records
+os.register_at_fork(after_in_child=_records.clear)
+
+
+def start_run(run_id=None):
+    """
+    Enable recording for this process and its workers (which inherit
+    the run id through the environment). Returns the run id.
+    """
+    run_id = run_id or os.environ.get(RUN_ID_ENV) or (
+        datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S") + "-" + uuid.uuid4().hex[:6]
+    )
+    os.environ[RUN_ID_ENV] = run_id
+    return run_id
+
+
+def current_run():
+    return os.environ.get(RUN_ID_ENV)
+
+
+def _cpu_seconds():
+    # This process plus finished children (cmdstan fits run as subprocesses)
+    t = os.times()
+    return t.user + t.system + t.children_user + t.children_system
+
+
+def _peak_rss_mb():
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+@contextmanager
+def stage(name, asset=None, rows=None):
+    """
+    Measure a pipeline stage. Nested stages inherit the asset.
+
+        with stage("prepare", asset="GOLD") as rec:
+            df = ...
+            rec["rows"] = len(df)
+
+    peak_rss_mb is the process high-water mark when the stage ends.
+    """
+    run_id = current_run()
+    rec = {"rows": rows}
+
+    if asset is not None:
+        token = _asset.set(asset)
+    else:
+        token = None
+        asset = _asset.get()
+
+    started_at = datetime.now(timezone.utc).isoformat()
+    wall = time.perf_counter()
+    cpu = _cpu_seconds()
+    status = "ok"
+
+    try:
+        yield rec
+    except BaseException:
+        status = "failed"
+        raise
+    finally:
+        if token is not None:
+            _asset.reset(token)
+
+        if run_id is not None:
+            _record({
+                "run_id": run_id,
+                "started_at": started_at,
+                "stage": name,
+                "asset": asset,
+                "wall_s": round(time.perf_counter() - wall, 6),
+                # process-wide: includes other threads of this process
+                "cpu_s": round(_cpu_seconds() - cpu, 6),
+                "peak_rss_mb": round(_peak_rss_mb(), 1),
+                "rows": None if rec["rows"] is None else int(rec["rows"]),
+                "status": status,
+                "pid": os.getpid(),
+            })
+
+
+def timed(name):
+    """
+    Decorator form of stage(); the row count is taken from the return
+    value when it has a length
+    """
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with stage(name) as rec:
+                result = fn(*args, **kwargs)
+                try:
+                    rec["rows"] = len(result)
+                except TypeError:
+                    pass
+                return result
+        return wrapper
+    return decorate
+
+
+def _record(rec):
+    print(json.dumps(rec), file=sys.stderr)
+    with _records_lock:
+        _records.append(rec)
+
+
+def drain():
+    """
+    Return and forget the records collected in this process
+    """
+    with _records_lock:
+        records = list(_records)
+        _records.clear()
+    return records
@@ -0,0 +1,35 @@
+from concurrent.futures import ThreadPoolExecutor
+
+
+def fetch_all(build_query, page_size=1000, concurrency=4):
+    """
+    Run a Supabase/PostgREST select to completion with range() paging.
+
+    build_query(count) must return a fresh, fully ordered select builder
+    (count is "exact" for the first page, None afterwards). The first
+    page also returns the total row count; the remaining pages are then
+    requested `concurrency` at a time. Raises instead of silently
+    returning a truncated result.
+
+    Returns list of row dicts in query order.
+    """
+    first = build_query("exact").range(0, page_size - 1).execute()
+
+    rows = list(first.data)
+    total = first.count if first.count is not None else len(rows)
+
+    def fetch_page(start):
+        return build_query(None).range(start, start + page_size - 1).execute().data
+
+    offsets = range(page_size, total, page_size)
+
+    if offsets:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            # map() keeps page order
+            for page in pool.map(fetch_page, offsets):
+                rows.extend(page)
+
+    if len(rows) != total:
+        raise RuntimeError(f"Expected {total} rows, received {len(rows)}")
+
+    return rows
@@ -0,0 +1,38 @@
+import random
+import time
+
+
+def backoff_delay(attempt, base_delay=0.5, max_delay=30.0):
+    """
+    Jittered exponential backoff ("full jitter"):
+    a random delay in [0, min(max_delay, base_delay * 2**attempt)]
+    """
+    return random.uniform(0, min(max_delay, base_delay * (2 ** attempt)))
+
+
+def retry_call(fn, attempts=3, base_delay=0.5, max_delay=30.0,
+               retry_on=(Exception,), label="call"):
+    """
+    Call fn() until it succeeds, retrying on the given exception types
+    with jittered exponential backoff. Re-raises the last error.
+
+    An exception with a numeric `retry_after` attribute (e.g. from a
+    Retry-After header) waits at least that many seconds.
+    """
+    for attempt in range(attempts):
+        try:
+            return fn()
+        except retry_on as exc:
+            if attempt == attempts - 1:
+                raise
+
+            delay = backoff_delay(attempt, base_delay, max_delay)
+            retry_after = getattr(exc, "retry_after", None)
+            if retry_after:
+                delay = max(delay, min(float(retry_after), max_delay))
+
+            print(
+                f"[WARN] {label} failed ({exc}), "
+                f"retry {attempt + 1}/{attempts - 1} in {delay:.1f}s"
+            )
+            time.sleep(delay)
@@ -0,0 +1,32 @@
+import os
+
+from dotenv import load_dotenv
+
+# Load .env file (local dev)
+load_dotenv()
+
+# Set SUPABASE_FAKE_DB to a SQLite path (or ":memory:") to run against the
+# in-process stand-in instead of Supabase, e.g. for offline benchmarks
+FAKE_DB_ENV = "SUPABASE_FAKE_DB"
+FAKE_LATENCY_ENV = "SUPABASE_FAKE_LATENCY"
+
+
+def create_supabase_client():
+    """
+    Supabase client from SUPABASE_URL / SUPABASE_SERVICE_KEY, or a
+    utils.fake_supabase.FakeSupabase when SUPABASE_FAKE_DB is set.
+    Raises ValueError when neither is configured.
+    """
+    fake_db = os.getenv(FAKE_DB_ENV)
+    if fake_db:
+        from .fake_supabase import FakeSupabase
+        return FakeSupabase(fake_db, latency=float(os.getenv(FAKE_LATENCY_ENV, "0")))
+
+    url = os.getenv("SUPABASE_URL")
+    key = os.getenv("SUPABASE_SERVICE_KEY")
+
+    if not url or not key:
+        raise ValueError("Supabase credentials not found in environment variables")
+
+    from supabase import create_client
+    return create_client(url, key)
@@ -0,0 +1,202 @@
+-- Schema for the forecast pipeline's Supabase tables.
+--
+-- Every upsert in the code targets a unique key via on_conflict:
+--   price_history        (date, asset)                       backfill / weekly append
+--   forecast_results     (date, asset)                       storage.cloud_store
+--   forecast_horizons    (run_date, asset, horizon)          storage.cloud_store
+--   forecast_error_stats (asset)                             storage.cloud_store
+--   run_metrics          (run_id, pid, started_at, stage)    storage.cloud_store
+-- PostgREST rejects on_conflict without a matching unique index, so
+-- run this once (psql or the SQL editor) before deploying. It is
+-- idempotent: existing duplicates are removed before the unique
+-- indexes are built, and forecast_error_stats is rebuilt from
+-- forecast_results.
+
+begin;
+
+-- ================== BASE TABLES ==================
+
+create table if not exists price_history (
+    date   date not null,
+    asset  text not null,
+    price  double precision,
+    source text
+);
+
+-- Weekly append (scripts/append_validated_history.py) tags its rows
+alter table price_history add column if not exists source text;
+
+create table if not exists forecast_results (
+    date            date not null,
+    asset           text not null,
+    predicted_price double precision,
+    actual_price    double precision,
+    error           double precision
+);
+
+-- Keep the most recently written row of each (date, asset)
+delete from price_history a
+using price_history b
+where a.date = b.date
+  and a.asset = b.asset
+  and a.ctid < b.ctid;
+
+delete from forecast_results a
+using forecast_results b
+where a.date = b.date
+  and a.asset = b.asset
+  and a.ctid < b.ctid;
+
+create unique index if not exists price_history_date_asset_key
+    on price_history (date, asset);
+
+create unique index if not exists forecast_results_date_asset_key
+    on forecast_results (date, asset);
+
+-- Incremental history loads filter by asset and date
+create index if not exists price_history_asset_date_idx
+    on price_history (asset, date);
+
+-- Asset discovery (main.py --discover) reads this instead of scanning
+-- price_history from the client
+create or replace view price_history_assets as
+    select distinct asset from price_history;
+
+-- Weekly append watermarks: one request for every asset's latest row
+-- (served from price_history_asset_date_idx)
+create or replace view price_history_latest as
+    select asset, max(date) as date from price_history group by asset;
+
+-- ================== NEW TABLES ==================
+
+create table if not exists forecast_horizons (
+    run_date    date not null,
+    asset       text not null,
+    horizon     integer not null,
+    target_date date not null,
+    yhat        double precision,
+    yhat_lower  double precision,
+    yhat_upper  double precision,
+    unique (run_date, asset, horizon)
+);
+
+create table if not exists forecast_error_stats (
+    asset                text primary key,
+    last_date            date,
+    count                integer not null default 0,
+    mae                  double precision,
+    rmse                 double precision,
+    mape                 double precision,
+    smape                double precision,
+    bias                 double precision,
+    directional_accuracy double precision,
+    rolling_mae          double precision,
+    rolling_mape         double precision,
+    -- Running aggregates (evaluation.metrics.empty_stats layout)
+    state                jsonb not null
+);
+
+create table if not exists run_metrics (
+    run_id      text not null,
+    started_at  timestamptz not null,
+    stage       text not null,
+    asset       text,
+    wall_s      double precision,
+    cpu_s       double precision,
+    peak_rss_mb double precision,
+    rows        bigint,
+    status      text,
+    pid         integer not null,
+    unique (run_id, pid, started_at, stage)
+);
+
+create index if not exists run_metrics_started_at_idx
+    on run_metrics (started_at);
+
+-- ================== SEED forecast_error_stats ==================
+-- Same sums, counts and 30-result window (evaluation.metrics.ROLLING_WINDOW)
+-- that update_stats() maintains, computed over existing results.
+
+insert into forecast_error_stats (
+    asset, last_date, count, mae, rmse, mape, smape, bias,
+    directional_accuracy, rolling_mae, rolling_mape, state
+)
+with results as (
+    select
+        asset,
+        date::date as date,
+        actual_price as a,
+        predicted_price as p,
+        lag(actual_price) over w as prev,
+        row_number() over (partition by asset order by date desc) as recent
+    from forecast_results
+    where actual_price is not null
+      and predicted_price is not null
+    window w as (partition by asset order by date)
+),
+sums as (
+    select
+        asset,
+        max(date) as last_date,
+        count(*) as n,
+        sum(abs(a - p)) as abs_err,
+        sum((a - p) ^ 2) as sq_err,
+        sum(p - a) as signed,
+        coalesce(sum(abs((a - p) / a) * 100) filter (where a <> 0), 0) as ape,
+        count(*) filter (where a <> 0) as n_ape,
+        coalesce(sum(2 * abs(a - p) / (abs(a) + abs(p)) * 100)
+            filter (where abs(a) + abs(p) <> 0), 0) as sape,
+        count(*) filter (where abs(a) + abs(p) <> 0) as n_sape,
+        coalesce(sum(case when sign(p - prev) = sign(a - prev) then 100 else 0 end)
+            filter (where prev is not null), 0) as hit,
+        count(*) filter (where prev is not null) as n_hit,
+        jsonb_agg(abs(a - p) order by date) filter (where recent <= 30) as window_abs,
+        jsonb_agg(case when a <> 0 then abs((a - p) / a) * 100 end order by date)
+            filter (where recent <= 30) as window_ape,
+        avg(abs(a - p)) filter (where recent <= 30) as rolling_mae,
+        avg(abs((a - p) / a) * 100) filter (where recent <= 30 and a <> 0) as rolling_mape,
+        max(a) filter (where recent = 1) as last_actual,
+        max(p) filter (where recent = 1) as last_predicted,
+        max(prev) filter (where recent = 1) as prev_actual
+    from results
+    group by asset
+)
+select
+    asset,
+    last_date,
+    n,
+    abs_err / n,
+    sqrt(greatest(sq_err / n, 0)),
+    ape / nullif(n_ape, 0),
+    sape / nullif(n_sape, 0),
+    signed / n,
+    hit / nullif(n_hit, 0),
+    rolling_mae,
+    rolling_mape,
+    jsonb_build_object(
+        'asset', asset,
+        'last_date', to_char(last_date, 'YYYY-MM-DD'),
+        'last_actual', last_actual,
+        'last_predicted', last_predicted,
+        'prev_actual', prev_actual,
+        'window_abs', window_abs,
+        'window_ape', window_ape,
+        'abs_err', abs_err, 'sq_err', sq_err, 'ape', ape, 'sape', sape,
+        'signed', signed, 'hit', hit,
+        'n', n, 'n_ape', n_ape, 'n_sape', n_sape, 'n_hit', n_hit
+    )
+from sums
+on conflict (asset) do update set
+    last_date = excluded.last_date,
+    count = excluded.count,
+    mae = excluded.mae,
+    rmse = excluded.rmse,
+    mape = excluded.mape,
+    smape = excluded.smape,
+    bias = excluded.bias,
+    directional_accuracy = excluded.directional_accuracy,
+    rolling_mae = excluded.rolling_mae,
+    rolling_mape = excluded.rolling_mape,
+    state = excluded.state;
+
+commit;
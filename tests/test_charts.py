@@ -0,0 +1,56 @@
+import numpy as np
+import pandas as pd
+
+from dashboard.charts import downsample, line_chart, lttb_indices
+
+
+def test_lttb_short_input_unchanged():
+    x = np.arange(10)
+
+    assert np.array_equal(lttb_indices(x, x * 2.0, 5), x)
+
+
+def test_lttb_keeps_endpoints_and_size():
+    x = np.arange(1000)
+    y = np.sin(x / 50.0)
+
+    idx = lttb_indices(x, y, 100)
+
+    assert len(idx) == 100
+    assert idx[0] == 0 and idx[-1] == 999
+    assert np.all(np.diff(idx) > 0)
+
+
+def test_lttb_keeps_spike():
+    x = np.arange(1000)
+    y = np.zeros(1000)
+    y[517] = 10.0
+
+    assert 517 in lttb_indices(x, y, 50)
+
+
+def test_downsample_per_group_with_dates():
+    days = pd.date_range("2020-01-01", periods=500)
+    df = pd.DataFrame({
+        "date": np.concatenate([days, days]),
+        "price": np.concatenate([np.arange(500.0), -np.arange(500.0)]),
+        "asset": ["A"] * 500 + ["B"] * 500,
+    })
+
+    out = downsample(df, "date", "price", group="asset", n_out=50)
+
+    assert out.groupby("asset").size().to_dict() == {"A": 50, "B": 50}
+    assert out.groupby("asset")["date"].first().eq(days[0]).all()
+    assert out.groupby("asset")["date"].last().eq(days[-1]).all()
+
+
+def test_line_chart_uses_given_width():
+    df = pd.DataFrame({
+        "date": pd.date_range("2000-01-01", periods=6000),
+        "price": np.arange(6000.0),
+        "asset": "A",
+    })
+
+    fig = line_chart(df, x="date", y="price", color="asset", n_out=500)
+
+    assert len(fig.data[0].x) == 500
@@ -0,0 +1,99 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from evaluation.metrics import (
+    ROLLING_WINDOW,
+    bias,
+    directional_accuracy,
+    error_table,
+    mae,
+    mape,
+    rmse,
+    smape,
+    stats_from_frame,
+    stats_kpis,
+)
+
+KPIS = ["mae", "rmse", "mape", "smape", "bias", "directional_accuracy"]
+
+
+@pytest.fixture
+def results():
+    rng = np.random.default_rng(0)
+    n = 2 * ROLLING_WINDOW
+    dates = pd.bdate_range("2024-01-01", periods=n)
+    frames = []
+
+    for asset, level in [("A", 100.0), ("B", 5.0)]:
+        actual = level + rng.normal(0, 1, n).cumsum()
+        frames.append(pd.DataFrame({
+            "date": dates,
+            "asset": asset,
+            "actual_price": actual,
+            "predicted_price": actual + rng.normal(0, 0.5, n),
+        }))
+
+    # Unsorted input
+    return pd.concat(frames, ignore_index=True).sample(frac=1, random_state=0)
+
+
+def test_array_metrics_ignore_nan_pairs():
+    actual = [100.0, 110.0, np.nan, 90.0]
+    predicted = [110.0, 100.0, 50.0, np.nan]
+
+    assert mae(actual, predicted) == 10.0
+    assert rmse(actual, predicted) == 10.0
+    assert bias(actual, predicted) == 0.0
+    assert mape(actual, predicted) == pytest.approx((10 / 100 + 10 / 110) / 2 * 100)
+    assert np.isnan(mae([np.nan], [1.0]))
+
+
+def test_mape_skips_zero_actuals():
+    assert mape([0.0, 100.0], [5.0, 90.0]) == pytest.approx(10.0)
+    assert np.isnan(smape([0.0], [0.0]))
+
+
+def test_directional_accuracy():
+    # up predicted / up actual, up predicted / down actual
+    assert directional_accuracy([11.0, 9.0], [12.0, 12.0], [10.0, 10.0]) == 50.0
+
+
+def test_error_table_matches_array_metrics(results):
+    table = error_table(results)
+
+    for asset, part in results.sort_values("date").groupby("asset"):
+        a, p = part["actual_price"], part["predicted_price"]
+        row = table.loc[asset]
+
+        assert row["count"] == len(part)
+        assert row["mae"] == pytest.approx(mae(a, p))
+        assert row["rmse"] == pytest.approx(rmse(a, p))
+        assert row["mape"] == pytest.approx(mape(a, p))
+        assert row["smape"] == pytest.approx(smape(a, p))
+        assert row["bias"] == pytest.approx(bias(a, p))
+        assert row["directional_accuracy"] == pytest.approx(
+            directional_accuracy(a, p, a.shift(1))
+        )
+
+
+def test_running_stats_match_error_table(results):
+    table = error_table(results)
+    rolling = error_table(results, window=ROLLING_WINDOW).groupby("asset").last()
+
+    for asset, stats in stats_from_frame(results).items():
+        kpis = stats_kpis(stats)
+
+        assert kpis["count"] == table.loc[asset, "count"]
+        for name in KPIS:
+            assert kpis[name] == pytest.approx(table.loc[asset, name])
+        assert kpis["rolling_mae"] == pytest.approx(rolling.loc[asset, "mae"])
+        assert kpis["rolling_mape"] == pytest.approx(rolling.loc[asset, "mape"])
+
+
+def test_error_table_custom_date_column(results):
+    renamed = results.rename(columns={"date": "target_date"})
+
+    pd.testing.assert_frame_equal(
+        error_table(renamed, date="target_date"), error_table(results)
+    )
@@ -0,0 +1,93 @@
+import numpy as np
+import pandas as pd
+
+from data.series import PriceSeries
+from processing.quality import QUALITY_COLUMNS, clean_histories
+
+
+def frame(days, prices):
+    return pd.DataFrame({"date": pd.to_datetime(days, format="ISO8601"), "price": prices})
+
+
+def quality_row(quality, asset):
+    return quality.set_index("asset").loc[asset]
+
+
+def test_duplicates_dropped_last_wins():
+    history = frame(["2024-01-01", "2024-01-02", "2024-01-02 15:30"], [1.0, 2.0, 2.5])
+
+    cleaned, quality = clean_histories({"A": history})
+
+    assert list(quality.columns) == QUALITY_COLUMNS
+    assert quality_row(quality, "A")["duplicates"] == 1
+    assert list(cleaned["A"].prices) == [1.0, 2.5]
+
+
+def test_short_gaps_filled_on_business_days_only():
+    # Fri, then Wed: Mon and Tue are gaps, the weekend is not
+    history = frame(["2024-01-05", "2024-01-10"], [1.0, 2.0])
+
+    cleaned, quality = clean_histories({"A": history}, ffill_limit=5)
+
+    assert list(cleaned["A"].dates) == list(pd.to_datetime(
+        ["2024-01-05", "2024-01-08", "2024-01-09", "2024-01-10"]
+    ))
+    assert list(cleaned["A"].prices) == [1.0, 1.0, 1.0, 2.0]
+    row = quality_row(quality, "A")
+    assert (row["gaps"], row["filled"], row["dropped"]) == (2, 2, 0)
+
+
+def test_long_gap_beyond_limit_dropped():
+    history = frame(["2024-01-01", "2024-01-10"], [1.0, 2.0])
+
+    cleaned, quality = clean_histories({"A": history}, ffill_limit=2)
+
+    row = quality_row(quality, "A")
+    assert (row["gaps"], row["filled"], row["dropped"]) == (6, 2, 4)
+    assert row["rows_out"] == 4
+
+
+def test_no_fill_outside_each_assets_span():
+    short = frame(["2024-01-03", "2024-01-04"], [1.0, 2.0])
+    long = frame(["2024-01-01", "2024-01-12"], [5.0, 6.0])
+
+    cleaned, _ = clean_histories({"short": short, "long": long}, ffill_limit=10)
+
+    assert cleaned["short"].first_date == pd.Timestamp("2024-01-03")
+    assert cleaned["short"].last_date == pd.Timestamp("2024-01-04")
+    assert len(cleaned["short"]) == 2
+
+
+def test_other_assets_off_calendar_rows_not_added():
+    # B has a Saturday row; A must not gain a (filled) Saturday
+    a = frame(["2024-01-05", "2024-01-08"], [1.0, 2.0])
+    b = frame(["2024-01-05", "2024-01-06", "2024-01-08"], [5.0, 6.0, 7.0])
+
+    cleaned, quality = clean_histories({"A": a, "B": b})
+
+    assert list(cleaned["A"].dates) == list(pd.to_datetime(["2024-01-05", "2024-01-08"]))
+    assert len(cleaned["B"]) == 3
+    assert quality_row(quality, "A")["gaps"] == 0
+
+
+def test_isolated_spike_masked_and_filled():
+    days = pd.bdate_range("2024-01-01", periods=40)
+    prices = 100.0 + 0.1 * np.sin(np.arange(40))
+    prices[30] = 150.0
+
+    cleaned, quality = clean_histories({"A": PriceSeries(days, prices)})
+
+    row = quality_row(quality, "A")
+    assert row["outliers"] == 1
+    assert row["filled"] == 1
+    assert cleaned["A"].prices[30] == prices[29]
+
+
+def test_level_shift_kept():
+    days = pd.bdate_range("2024-01-01", periods=40)
+    prices = np.where(np.arange(40) < 30, 100.0, 150.0) + 0.1 * np.sin(np.arange(40))
+
+    cleaned, quality = clean_histories({"A": PriceSeries(days, prices)})
+
+    assert quality_row(quality, "A")["outliers"] == 0
+    assert np.array_equal(cleaned["A"].prices, prices)
@@ -0,0 +1,92 @@
+import numpy as np
+import pandas as pd
+
+from data.series import APPEND_HEADROOM, PriceSeries
+
+
+def make_series(days, prices):
+    return PriceSeries.from_arrays(pd.to_datetime(days), prices)
+
+
+def test_from_arrays_sorts_and_keeps_last_duplicate():
+    s = make_series(["2024-01-03", "2024-01-01", "2024-01-03", "2024-01-02"], [3.0, 1.0, 30.0, 2.0])
+
+    assert list(s.dates) == list(pd.to_datetime(["2024-01-01", "2024-01-02", "2024-01-03"]))
+    assert list(s.prices) == [1.0, 2.0, 30.0]
+
+
+def test_append_later_date_in_place():
+    s = make_series(["2024-01-01", "2024-01-02"], [1.0, 2.0])
+    buffer = s._dates
+
+    s.append("2024-01-03", 3.0)
+
+    assert len(s) == 3
+    assert s.last_date == pd.Timestamp("2024-01-03")
+    assert s.last_price == 3.0
+    assert s._dates is buffer
+
+
+def test_append_existing_date_replaces_or_keeps():
+    s = make_series(["2024-01-01", "2024-01-02"], [1.0, 2.0])
+
+    s.append("2024-01-02", 20.0)
+    assert list(s.prices) == [1.0, 20.0]
+
+    s.append("2024-01-01", 10.0, replace=False)
+    assert list(s.prices) == [1.0, 20.0]
+    assert len(s) == 2
+
+
+def test_append_out_of_order_inserts_sorted():
+    s = make_series(["2024-01-01", "2024-01-03"], [1.0, 3.0])
+
+    s.append("2024-01-02", 2.0)
+
+    assert list(s.prices) == [1.0, 2.0, 3.0]
+    assert "2024-01-02" in s
+
+
+def test_append_grows_past_capacity():
+    s = PriceSeries()
+
+    for i, day in enumerate(pd.date_range("2024-01-01", periods=3 * APPEND_HEADROOM)):
+        s.append(day, float(i))
+
+    assert len(s) == 3 * APPEND_HEADROOM
+    assert np.array_equal(s.prices, np.arange(3 * APPEND_HEADROOM, dtype="float64"))
+
+
+def test_extend_newer_rows_in_bulk():
+    s = make_series(["2024-01-01"], [1.0])
+
+    s.extend(pd.to_datetime(["2024-01-03", "2024-01-02"]), [3.0, 2.0])
+
+    assert list(s.prices) == [1.0, 2.0, 3.0]
+
+
+def test_extend_overlap_follows_replace():
+    days = pd.to_datetime(["2024-01-02", "2024-01-03"])
+
+    replaced = make_series(["2024-01-01", "2024-01-02"], [1.0, 2.0]).extend(days, [20.0, 30.0])
+    kept = make_series(["2024-01-01", "2024-01-02"], [1.0, 2.0]).extend(days, [20.0, 30.0], replace=False)
+
+    assert list(replaced.prices) == [1.0, 20.0, 30.0]
+    assert list(kept.prices) == [1.0, 2.0, 30.0]
+
+
+def test_views_are_read_only():
+    s = make_series(["2024-01-01"], [1.0])
+
+    assert not s.prices.flags.writeable
+    assert not s.dates.flags.writeable
+
+
+def test_to_prophet_frame_does_not_copy():
+    s = make_series(["2024-01-01", "2024-01-02"], [1.0, 2.0])
+
+    frame = s.to_prophet_frame()
+
+    assert list(frame.columns) == ["ds", "y"]
+    assert np.shares_memory(frame["y"].to_numpy(), s._prices)
+    assert np.shares_memory(frame["ds"].to_numpy(), s._dates)